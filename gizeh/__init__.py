@@ -1,17 +1,34 @@
 """gizeh/__init__.py"""
 
-from .geometry import polar2cart, rotation_matrix, scaling_matrix, translation_matrix
+from .atlas import ImageAtlas
+from .geometry import (
+    clear_geometry_cache,
+    geometry_cache_info,
+    polar2cart,
+    rotation_matrices,
+    rotation_matrix,
+    scaling_matrices,
+    scaling_matrix,
+    set_geometry_cache_size,
+    transform_matrices,
+    transform_points,
+    translation_matrices,
+    translation_matrix,
+)
 from .gizeh import (  # noqa: F401
     ColorGradient,
     Element,
     Group,
     ImagePattern,
     PDFSurface,
+    RecordingSurface,
     Surface,
+    SVGSurface,
     arc,
     bezier_curve,
     circle,
     ellipse,
+    instances,
     polyline,
     rectangle,
     regular_polygon,
@@ -19,26 +36,59 @@ from .gizeh import (  # noqa: F401
     star,
     text,
 )
+from .profiling import Profiler, profile
+from .timeline import Layer, Timeline
+from .tools import htmlcolor_to_rgb, parse_color, parse_colors
 
 __all__ = [
     "polar2cart",
     "rotation_matrix",
     "scaling_matrix",
     "translation_matrix",
+    "rotation_matrices",
+    "scaling_matrices",
+    "translation_matrices",
+    "transform_matrices",
+    "transform_points",
+    "geometry_cache_info",
+    "set_geometry_cache_size",
+    "clear_geometry_cache",
     "Element",
     "Group",
     "Surface",
     "PDFSurface",
+    "SVGSurface",
+    "RecordingSurface",
     "ColorGradient",
     "ImagePattern",
+    "ImageAtlas",
     "arc",
     "bezier_curve",
     "circle",
     "ellipse",
+    "instances",
     "polyline",
     "rectangle",
     "regular_polygon",
     "square",
     "star",
     "text",
+    "Profiler",
+    "profile",
+    "Layer",
+    "Timeline",
+    "htmlcolor_to_rgb",
+    "parse_color",
+    "parse_colors",
+    "AsyncRenderer",
 ]
+
+
+def __getattr__(name):
+    # gizeh.aio imports asyncio, which is slow to import: only import it when
+    # it is used.
+    if name == "AsyncRenderer":
+        from .aio import AsyncRenderer
+
+        return AsyncRenderer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
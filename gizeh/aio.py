@@ -0,0 +1,121 @@
+"""Rendering from asyncio code without blocking the event loop.
+
+The blocking work (drawing, PNG encoding) runs in a bounded thread pool, and
+a semaphore limits how many renders run at once. Cancelling the awaiting task
+stops a render between two elements, including the elements of groups and the
+instances of ``instances``::
+
+    async def handle_request(request):
+        surface = gizeh.Surface(640, 480, bg_color=(1, 1, 1))
+        await surface.render_async(make_scene(request))
+        return await surface.to_png_bytes_async()
+
+Cairo releases the GIL while rasterizing, so renders of different surfaces
+run in parallel. A same surface should not be drawn on from several renders
+at once.
+"""
+
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .gizeh import Element, _thread_state
+
+_default_renderer = None
+
+
+class AsyncRenderer:
+    """Runs gizeh rendering tasks on a bounded thread pool.
+
+    Parameters
+    ------------
+    max_workers
+      Number of threads of the pool.
+
+    max_concurrency
+      Maximal number of renders running at the same time in an event loop,
+      the others wait (asynchronously) for their turn. Default is
+      `max_workers`.
+    """
+
+    def __init__(self, max_workers=4, max_concurrency=None):
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="gizeh"
+        )
+        self._semaphores = weakref.WeakKeyDictionary()  # one per event loop
+
+    async def run(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` in the thread pool and return its
+        result, waiting first for a free slot if `max_concurrency` renders
+        are already running."""
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        semaphore = self._semaphores[loop]
+        await semaphore.acquire()
+        try:
+            future = loop.run_in_executor(
+                self._executor, partial(func, *args, **kwargs)
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+        # A running thread cannot be interrupted: if the awaiting task is
+        # cancelled, the slot is only released once the function returns.
+        future.add_done_callback(partial(_release_slot, semaphore))
+        return await asyncio.shield(future)
+
+    async def render(self, surface, elements):
+        """Draw an Element, or a list of Elements, on the surface.
+
+        If the awaiting task is cancelled, the drawing stops before the next
+        element (or element of a group, or instance). Returns the surface.
+        """
+        if isinstance(elements, Element):
+            elements = [elements]
+        cancelled = threading.Event()
+
+        def draw_elements():
+            _thread_state.cancelled = cancelled
+            try:
+                for element in elements:
+                    if cancelled.is_set():
+                        return
+                    element.draw(surface)
+            finally:
+                _thread_state.cancelled = None
+            return surface
+
+        try:
+            return await self.run(draw_elements)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def to_png_bytes(self, surface, y_origin="top"):
+        """Return the PNG data of the surface (see Surface.to_png_bytes)."""
+        return await self.run(surface.to_png_bytes, y_origin=y_origin)
+
+    def shutdown(self, wait=True):
+        """Stop the thread pool, after the running renders if `wait`."""
+        self._executor.shutdown(wait=wait)
+
+
+def _release_slot(semaphore, future):
+    """Release a slot of AsyncRenderer.run once its function has returned."""
+    if not future.cancelled():
+        future.exception()  # retrieved, in case nobody awaits it anymore
+    semaphore.release()
+
+
+def default_renderer():
+    """Return the AsyncRenderer used by Surface.render_async and
+    Surface.to_png_bytes_async when no renderer is provided."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = AsyncRenderer()
+    return _default_renderer
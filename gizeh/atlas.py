@@ -0,0 +1,125 @@
+"""Sprite atlases: many small images packed into one surface.
+
+Each ImagePattern built from a numpy image has its own cairo surface. An
+ImageAtlas packs all the images into a single surface, and gives for each of
+them an ImagePattern reading its rectangle of the shared surface::
+
+    atlas = ImageAtlas({"star": star_icon, "heart": heart_icon})
+    heart = atlas.pattern("heart", pixel_zero=(8, 8))  # center of a 16x16 icon
+    markers = [gizeh.square(16, xy=xy, fill=heart) for xy in positions]
+
+The patterns of an atlas are created once: all the shapes filled with a same
+pattern reuse it.
+"""
+
+import numpy as np
+
+from .gizeh import ImagePattern, Surface
+
+
+def _rgba(image):
+    """Return a (H,W,4) uint8 version of a grayscale, RGB or RGBA image."""
+    image = np.asarray(image)
+    if image.ndim == 2:
+        image = image[:, :, None]
+    h, w, d = image.shape
+    if d == 4:
+        return image
+    rgba = np.empty((h, w, 4), dtype=np.uint8)
+    rgba[:, :, :3] = image
+    rgba[:, :, 3] = 255
+    return rgba
+
+
+def _shelf_pack(sizes, max_width=2048, padding=1):
+    """Place rectangles of the given (width, height) sizes in rows ("shelves")
+    of at most `max_width` pixels, the tallest rectangles first.
+
+    Returns ``(positions, (width, height))`` where positions is the list of
+    the (x, y) top-left corners of the rectangles (in the order of `sizes`)
+    and (width, height) the size of the rectangle containing them all. The
+    rectangles are separated by `padding` pixels.
+    """
+    positions = [None] * len(sizes)
+    x = y = shelf_height = width = 0
+    for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+        w, h = sizes[i]
+        if x > 0 and x + w > max_width:  # start a new shelf
+            x, y, shelf_height = 0, y + shelf_height + padding, 0
+        positions[i] = (x, y)
+        x += w + padding
+        width = max(width, x - padding)
+        shelf_height = max(shelf_height, h)
+    return positions, (width, y + shelf_height)
+
+
+class ImageAtlas:
+    """Many images packed into one surface, to be used as fills and strokes.
+
+    Parameters
+    ------------
+    images
+      List of numpy images (grayscale, RGB or RGBA, see Surface.from_image),
+      or dict ``{key: image}``.
+
+    max_width
+      Maximal width in pixels of the atlas (images wider than that get a row
+      of their own).
+
+    padding
+      Number of transparent pixels between the images, which keeps the
+      filters (e.g. "bilinear") from blending neighbouring images.
+
+    filter, extend
+      Default parameters of the patterns (see ImagePattern).
+    """
+
+    def __init__(self, images, max_width=2048, padding=1, filter="best", extend="none"):
+        if isinstance(images, dict):
+            keys, images = list(images.keys()), list(images.values())
+        else:
+            keys = list(range(len(images)))
+        images = [_rgba(image) for image in images]
+        sizes = [(image.shape[1], image.shape[0]) for image in images]
+        positions, (width, height) = _shelf_pack(sizes, max_width, padding)
+        atlas = np.zeros((height, width, 4), dtype=np.uint8)
+        for image, (x, y) in zip(images, positions):
+            atlas[y : y + image.shape[0], x : x + image.shape[1]] = image
+        self.surface = Surface.from_image(atlas)
+        self.boxes = {
+            key: (x, y, w, h) for key, (x, y), (w, h) in zip(keys, positions, sizes)
+        }
+        self.filter = filter
+        self.extend = extend
+        self._subsurfaces = {}
+        self._patterns = {}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __getitem__(self, key):
+        return self.pattern(key)
+
+    def _subsurface(self, key):
+        """Return the cairo surface of one image: a view on the atlas."""
+        if key not in self._subsurfaces:
+            surface = self.surface._cairo_surface.create_for_rectangle(*self.boxes[key])
+            self._subsurfaces[key] = surface
+        return self._subsurfaces[key]
+
+    def pattern(self, key, pixel_zero=None, filter=None, extend=None):
+        """Return an ImagePattern of one image of the atlas (see ImagePattern
+        for the parameters). Patterns with the same parameters are created
+        once and shared."""
+        if pixel_zero is None:
+            pixel_zero = (0, 0)
+        pixel_zero = tuple(pixel_zero)
+        params = (key, pixel_zero, filter, extend)
+        if params not in self._patterns:
+            self._patterns[params] = ImagePattern(
+                self._subsurface(key),
+                pixel_zero,
+                filter=filter or self.filter,
+                extend=extend or self.extend,
+            )
+        return self._patterns[params]
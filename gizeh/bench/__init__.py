@@ -0,0 +1,259 @@
+"""Benchmarks for Gizeh.
+
+Run them from the command line with ``python -m gizeh.bench`` (see
+``python -m gizeh.bench --help``), or from Python::
+
+    from gizeh.bench import run_benchmarks, compare_results
+    results = run_benchmarks(pattern="draw")
+
+Each benchmark is a function decorated with ``@benchmark`` which prepares its
+data and returns the function to be timed.
+
+Equivalence checks validate the faster rendering paths (groups, instances,
+recordings...): each one renders a same scene through a reference path and
+a candidate path, compares the images with a tolerance, and records the time
+and peak memory (of Python objects, and of the whole process) of both
+paths::
+
+    from gizeh.bench import run_equivalences
+    results = run_equivalences(size=5000)
+    failed = [name for name, r in results["results"].items() if not r["passed"]]
+"""
+
+import fnmatch
+import os
+import platform
+import statistics
+import sys
+import threading
+import timeit
+import tracemalloc
+
+import numpy as np
+
+BENCHMARKS = {}
+EQUIVALENCES = {}
+
+
+def benchmark(func):
+    """Register a benchmark.
+
+    The decorated function takes no argument, does all the set up (creating
+    scenes, images...) and returns a function without arguments doing the
+    work to be timed.
+    """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _environment():
+    """Return the versions of the components which influence the timings."""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python 3.7
+        from importlib_metadata import PackageNotFoundError, version
+
+    import cairocffi
+    import numpy
+
+    try:
+        gizeh_version = version("gizeh")
+    except PackageNotFoundError:
+        gizeh_version = "unknown"
+    return {
+        "gizeh": gizeh_version,
+        "python": platform.python_version(),
+        "numpy": numpy.__version__,
+        "cairo": cairocffi.cairo_version_string(),
+        "platform": platform.platform(),
+    }
+
+
+def run_benchmarks(pattern="*", repeat=5, verbose=False):
+    """Run the benchmarks whose name matches the given glob `pattern`.
+
+    Every benchmark is timed `repeat` times, then run twice more to measure
+    its memory use: "peak_rss" is the largest increase of the resident memory
+    of the process during the run, which includes native allocations (e.g.
+    cairo's surfaces), and "python_peak_memory" is the peak memory allocated
+    by Python objects (e.g. Elements), as traced by tracemalloc, which does
+    not see native allocations. Returns a dict of the form ``{"environment":
+    {...}, "results": {name: {"min": ..., "median": ..., "repeat": ...,
+    "peak_rss": ..., "python_peak_memory": ...}}}`` where the times are in
+    seconds and the memory in bytes, which can be written as JSON. The
+    resident memory is only measured on Linux ("peak_rss" is None elsewhere).
+    """
+    from . import cases  # noqa: F401  (registers the benchmarks)
+
+    if "*" not in pattern and "?" not in pattern:
+        pattern = f"*{pattern}*"
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        results[name] = result = _measure(setup(), repeat)[1]
+        if verbose:
+            print(
+                f"{name:<30} {1000 * result['min']:10.2f} ms"
+                f" {result['python_peak_memory'] / 1e6:10.2f} MB",
+                file=sys.stderr,
+            )
+    return {"environment": _environment(), "results": results}
+
+
+def _rss():
+    """Return the resident memory of the process in bytes, or None if it
+    can't be read (it is read from /proc, on Linux)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _peak_rss_increase(func, interval=0.001):
+    """Run `func` while sampling the resident memory of the process every
+    `interval` seconds, and return how much it grew at most (in bytes), or
+    None if it can't be measured on this platform."""
+    start = _rss()
+    if start is None:
+        func()
+        return None
+    peak = [start]
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval):
+            peak[0] = max(peak[0], _rss())
+
+    thread = threading.Thread(target=sample, daemon=True)
+    thread.start()
+    try:
+        func()
+    finally:
+        done.set()
+        thread.join()
+    return max(peak[0], _rss()) - start
+
+
+def _measure(timed, repeat):
+    """Run `timed` once to warm up (caches, lazy imports...), `repeat` times
+    to time it, then once while sampling the resident memory of the process
+    and once while tracing the memory allocated by Python objects. Returns
+    the output of the function, and the measures."""
+    output = timed()
+    times = timeit.repeat(timed, repeat=repeat, number=1)
+    peak_rss = _peak_rss_increase(timed)
+    tracemalloc.start()
+    timed()
+    python_peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return output, {
+        "min": min(times),
+        "median": statistics.median(times),
+        "repeat": repeat,
+        "peak_rss": peak_rss,
+        "python_peak_memory": python_peak_memory,
+    }
+
+
+def compare_results(results, baseline):
+    """Compare benchmark results to baseline results.
+
+    Both arguments are outputs of ``run_benchmarks``. Returns a list of
+    ``(name, baseline_time, new_time, ratio)`` for all benchmarks present in
+    both, where ratio = new_time / baseline_time (computed on minimal times).
+    """
+    comparison = []
+    for name, result in results["results"].items():
+        if name in baseline["results"]:
+            old, new = baseline["results"][name]["min"], result["min"]
+            comparison.append((name, old, new, new / old))
+    return comparison
+
+
+def find_regressions(results, baseline, tolerance=0.1):
+    """Return the benchmarks which are more than `tolerance` (i.e. 10% by
+    default) slower than in the baseline, in the format of compare_results.
+    """
+    comparison = compare_results(results, baseline)
+    return [c for c in comparison if c[3] > 1 + tolerance]
+
+
+def equivalence(max_diff=0, mean_diff=0.0):
+    """Register an equivalence check.
+
+    The decorated function takes the size of the scene (e.g. a number of
+    elements) and returns two functions without arguments, the reference
+    and the candidate, each rendering the scene and returning it as a numpy
+    image. The images are equivalent if no channel of a pixel differs by
+    more than `max_diff` and if the mean absolute difference over all
+    channels is at most `mean_diff` (in 0-255 units).
+    """
+
+    def decorator(func):
+        EQUIVALENCES[func.__name__] = (func, {"max": max_diff, "mean": mean_diff})
+        return func
+
+    return decorator
+
+
+def image_difference(image, reference):
+    """Compare two images of the same shape. Returns a dict with the
+    maximal ("max") and mean ("mean") absolute difference between channels,
+    and the fraction of pixels which differ at all ("pixels")."""
+    if image.shape != reference.shape:
+        raise ValueError(f"Shapes differ: {image.shape} vs {reference.shape}")
+    diff = np.abs(image.astype(np.int16) - reference.astype(np.int16))
+    pixels = diff.max(axis=-1) if diff.ndim == 3 else diff
+    return {
+        "max": int(diff.max(initial=0)),
+        "mean": float(diff.mean()) if diff.size else 0.0,
+        "pixels": float((pixels > 0).mean()) if pixels.size else 0.0,
+    }
+
+
+def run_equivalences(pattern="*", size=1000, repeat=3, verbose=False):
+    """Run the equivalence checks whose name matches the glob `pattern`, on
+    scenes of the given size.
+
+    Returns a dict ``{"environment": {...}, "results": {name: {"size",
+    "reference", "candidate", "speedup", "difference", "tolerance",
+    "passed"}}}`` where "reference" and "candidate" are time and memory
+    measures (see run_benchmarks), "speedup" is the ratio of their minimal
+    times, and "difference" compares the images (see image_difference).
+    """
+    from . import equivalences  # noqa: F401  (registers the checks)
+
+    if "*" not in pattern and "?" not in pattern:
+        pattern = f"*{pattern}*"
+    results = {}
+    for name, (setup, tolerance) in EQUIVALENCES.items():
+        if not fnmatch.fnmatch(name, pattern):
+            continue
+        reference, candidate = setup(size)
+        reference_image, reference_measures = _measure(reference, repeat)
+        candidate_image, candidate_measures = _measure(candidate, repeat)
+        difference = image_difference(candidate_image, reference_image)
+        passed = (
+            difference["max"] <= tolerance["max"]
+            and difference["mean"] <= tolerance["mean"]
+        )
+        results[name] = {
+            "size": size,
+            "reference": reference_measures,
+            "candidate": candidate_measures,
+            "speedup": reference_measures["min"] / candidate_measures["min"],
+            "difference": difference,
+            "tolerance": tolerance,
+            "passed": passed,
+        }
+        if verbose:
+            print(
+                f"{name:<30} {'ok' if passed else 'FAILED':<6}"
+                f" max diff {difference['max']:3d}"
+                f" mean diff {difference['mean']:6.3f}"
+                f" speedup {results[name]['speedup']:6.2f}x",
+                file=sys.stderr,
+            )
+    return {"environment": _environment(), "results": results}
@@ -0,0 +1,100 @@
+"""Command line interface of the Gizeh benchmarks.
+
+Examples::
+
+    python -m gizeh.bench --list
+    python -m gizeh.bench --output baseline.json
+    python -m gizeh.bench --baseline baseline.json --tolerance 0.15
+    python -m gizeh.bench --equivalence --size 5000
+"""
+
+import argparse
+import json
+import sys
+
+from . import (
+    BENCHMARKS,
+    EQUIVALENCES,
+    compare_results,
+    find_regressions,
+    run_benchmarks,
+    run_equivalences,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m gizeh.bench", description="Run the Gizeh benchmarks."
+    )
+    parser.add_argument(
+        "pattern", nargs="?", default="*", help="Only run benchmarks matching this."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON results file to compare to.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Slowdown ratio over the baseline counted as a regression.",
+    )
+    parser.add_argument("--list", action="store_true", help="List the benchmarks.")
+    parser.add_argument(
+        "--equivalence",
+        action="store_true",
+        help="Run the equivalence checks of the rendering paths instead.",
+    )
+    parser.add_argument(
+        "--size", type=int, default=1000, help="Size of the equivalence scenes."
+    )
+    args = parser.parse_args(argv)
+
+    if args.list:
+        from . import cases, equivalences  # noqa: F401
+
+        names = EQUIVALENCES if args.equivalence else BENCHMARKS
+        print("\n".join(names))
+        return 0
+
+    if args.equivalence:
+        results = run_equivalences(
+            args.pattern, size=args.size, repeat=args.repeat, verbose=True
+        )
+        _write_results(results, args.output)
+        failed = [name for name, r in results["results"].items() if not r["passed"]]
+        if failed:
+            print(f"Not equivalent: {', '.join(failed)}", file=sys.stderr)
+            return 1
+        return 0
+
+    results = run_benchmarks(args.pattern, repeat=args.repeat, verbose=True)
+    _write_results(results, args.output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        for name, old, new, ratio in compare_results(results, baseline):
+            print(
+                f"{name:<30} {1000 * old:10.2f} ms -> {1000 * new:10.2f} ms"
+                f"  ({ratio:.2f}x)",
+                file=sys.stderr,
+            )
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            names = ", ".join(r[0] for r in regressions)
+            print(f"Regressions: {names}", file=sys.stderr)
+            return 1
+    return 0
+
+
+def _write_results(results, output=None):
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""The benchmarks run by ``python -m gizeh.bench``."""
+
+import subprocess
+import sys
+from io import BytesIO
+
+import numpy as np
+
+import gizeh as gz
+
+from . import benchmark
+
+W, H = 640, 480
+N_SHAPES = 2000
+
+
+def _random_squares(n=N_SHAPES, seed=123):
+    rng = np.random.RandomState(seed)
+    return [
+        gz.square(
+            size,
+            xy=xy,
+            angle=angle,
+            fill=color,
+            stroke=(0, 0, 0),
+            stroke_width=1,
+        )
+        for size, xy, angle, color in zip(
+            10 + 20 * rng.rand(n),
+            rng.rand(n, 2) * [W, H],
+            2 * np.pi * rng.rand(n),
+            rng.rand(n, 3),
+        )
+    ]
+
+
+def _image(w, h, channels=3, seed=123):
+    rng = np.random.RandomState(seed)
+    return rng.randint(0, 256, size=(h, w, channels)).astype(np.uint8)
+
+
+@benchmark
+def import_time():
+    # In a new interpreter (whose startup time is included), with the
+    # importation of cairocffi and asyncio deferred to their first use.
+    command = [sys.executable, "-c", "import gizeh"]
+    return lambda: subprocess.run(command, check=True)
+
+
+@benchmark
+def scene_construction():
+    return _random_squares
+
+
+@benchmark
+def transforms():
+    elements = _random_squares()
+
+    def run():
+        for e in elements:
+            e.rotate(0.5, center=[10, 10]).translate([5, 5]).scale(1.5)
+
+    return run
+
+
+@benchmark
+def group_draw():
+    group = gz.Group(_random_squares()).rotate(0.1, center=[W / 2, H / 2])
+    return lambda: group.draw(gz.Surface(W, H, bg_color=(1, 1, 1)))
+
+
+@benchmark
+def clipped_group_draw():
+    # Most of the shapes are outside of the clip and are culled.
+    clip = gz.circle(H / 8, xy=(W / 2, H / 2))
+    group = gz.Group(_random_squares(), clip=clip)
+    return lambda: group.draw(gz.Surface(W, H, bg_color=(1, 1, 1)))
+
+
+@benchmark
+def many_shapes_draw():
+    rng = np.random.RandomState(123)
+    circles = [
+        gz.circle(r, xy=xy, fill=color)
+        for r, xy, color in zip(
+            2 + 5 * rng.rand(10 * N_SHAPES),
+            rng.rand(10 * N_SHAPES, 2) * [W, H],
+            rng.rand(10 * N_SHAPES, 4),
+        )
+    ]
+
+    def run():
+        surface = gz.Surface(W, H, bg_color=(1, 1, 1))
+        for c in circles:
+            c.draw(surface)
+
+    return run
+
+
+@benchmark
+def instances_draw():
+    rng = np.random.RandomState(123)
+    markers = gz.instances(
+        gz.circle(3, stroke_width=0.5),
+        xy=rng.rand(10 * N_SHAPES, 2) * [W, H],
+        fills=rng.rand(10 * N_SHAPES, 4),
+    )
+    return lambda: markers.draw(gz.Surface(W, H, bg_color=(1, 1, 1)))
+
+
+@benchmark
+def parse_colors():
+    # Categorical data: many values, few distinct colors.
+    palette = np.array([f"#{i:02x}{255 - i:02x}80" for i in range(0, 256, 16)])
+    strings = palette[np.random.RandomState(123).randint(0, 16, 25 * N_SHAPES)]
+    return lambda: gz.parse_colors(strings)
+
+
+@benchmark
+def text_draw():
+    texts = [
+        gz.text(
+            f"Gizeh {i}",
+            fontfamily="Sans",
+            fontsize=12 + i % 20,
+            xy=(i % W, (7 * i) % H),
+            angle=i / 10,
+            fill=(0, 0, 0.5),
+        )
+        for i in range(200)
+    ]
+    return lambda: gz.Group(texts).draw(gz.Surface(W, H))
+
+
+@benchmark
+def gradients_draw():
+    linear = gz.ColorGradient(
+        "linear", [(0, (1, 0, 0)), (1, (0, 0, 1, 0.5))], xy1=(-20, 0), xy2=(20, 0)
+    )
+    radial = gz.ColorGradient(
+        "radial", [(0, (1, 1, 1)), (1, (0, 0.5, 0))], (0, 0), (0, 0), (0, 20)
+    )
+    shapes = [
+        gz.circle(20, xy=((37 * i) % W, (53 * i) % H), fill=[linear, radial][i % 2])
+        for i in range(N_SHAPES // 4)
+    ]
+    return lambda: gz.Group(shapes).draw(gz.Surface(W, H))
+
+
+@benchmark
+def image_pattern_draw():
+    pattern = gz.ImagePattern(_image(64, 64), pixel_zero=(32, 32))
+    shapes = [
+        gz.square(64, xy=((37 * i) % W, (53 * i) % H), fill=pattern)
+        for i in range(N_SHAPES // 4)
+    ]
+    return lambda: gz.Group(shapes).draw(gz.Surface(W, H))
+
+
+def _icons(n=100, size=16):
+    return [_image(size, size, 4, seed=i) for i in range(n)]
+
+
+@benchmark
+def image_patterns_icons():
+    icons = _icons()
+
+    def run():
+        patterns = [gz.ImagePattern(icon, pixel_zero=(8, 8)) for icon in icons]
+        shapes = [
+            gz.square(16, xy=((37 * i) % W, (53 * i) % H), fill=patterns[i % 100])
+            for i in range(N_SHAPES)
+        ]
+        gz.Group(shapes).draw(gz.Surface(W, H))
+
+    return run
+
+
+@benchmark
+def image_atlas_icons():
+    icons = _icons()
+
+    def run():
+        atlas = gz.ImageAtlas(icons)
+        patterns = [atlas.pattern(i, pixel_zero=(8, 8)) for i in range(len(icons))]
+        shapes = [
+            gz.square(16, xy=((37 * i) % W, (53 * i) % H), fill=patterns[i % 100])
+            for i in range(N_SHAPES)
+        ]
+        gz.Group(shapes).draw(gz.Surface(W, H))
+
+    return run
+
+
+@benchmark
+def numpy_image_fill_draw():
+    # The texture is converted once for all the shapes.
+    image = _image(64, 64)
+    shapes = [
+        gz.square(64, xy=((37 * i) % W, (53 * i) % H), fill=image)
+        for i in range(N_SHAPES // 4)
+    ]
+    return lambda: gz.Group(shapes).draw(gz.Surface(W, H))
+
+
+@benchmark
+def get_npimage_1080p():
+    surface = gz.Surface.from_image(_image(1920, 1080, 4))
+    return lambda: surface.get_npimage(transparent=True)
+
+
+@benchmark
+def from_image_1080p():
+    image = _image(1920, 1080)
+    return lambda: gz.Surface.from_image(image)
+
+
+def _translucent_4k_surface():
+    # Half of the pixels are semi-transparent and need an alpha conversion.
+    image = _image(3840, 2160, 4)
+    image[::2, :, 3] = 255
+    return gz.Surface.from_image(image)
+
+
+@benchmark
+def get_npimage_4k_transparent():
+    surface = _translucent_4k_surface()
+    return lambda: surface.get_npimage(transparent=True)
+
+
+@benchmark
+def get_npimage_4k_opaque():
+    surface = gz.Surface.from_image(_image(3840, 2160))
+    return lambda: surface.get_npimage(transparent=True)
+
+
+@benchmark
+def from_image_4k_rgba():
+    image = _translucent_4k_surface().get_npimage(transparent=True)
+    return lambda: gz.Surface.from_image(image)
+
+
+@benchmark
+def png_export():
+    surface = gz.Surface(W, H, bg_color=(1, 1, 1))
+    gz.Group(_random_squares()).draw(surface)
+    return lambda: surface.write_to_png(BytesIO())
+
+
+@benchmark
+def pdf_export():
+    squares = _random_squares()
+
+    def run():
+        pdf = gz.PDFSurface(BytesIO(), W, H, bg_color=(1, 1, 1))
+        gz.Group(squares).draw(pdf)
+        pdf.finish()
+
+    return run
+
+
+@benchmark
+def element_memory():
+    # 20,000 elements: see the python_peak_memory of this benchmark.
+    return lambda: (
+        _random_squares(5 * N_SHAPES)
+        + [gz.circle(5, xy=(i, i), fill=(1, 0, 0)) for i in range(5 * N_SHAPES)]
+    )
@@ -0,0 +1,198 @@
+"""The equivalence checks run by ``python -m gizeh.bench --equivalence``.
+
+Each check renders a same scene with a rendering path of Gizeh (the
+candidate) and with a simpler, older one (the reference).
+"""
+
+import numpy as np
+
+import gizeh as gz
+
+from . import equivalence
+
+W, H = 640, 480
+
+
+def _render(draw, scale=1.0):
+    surface = gz.Surface(W, H, bg_color=(1, 1, 1), scale=scale)
+    draw(surface)
+    return surface.get_npimage()
+
+
+def _scene(size, seed=123):
+    """Random overlapping shapes of all kinds, and a few texts."""
+    rng = np.random.RandomState(seed)
+    xy = rng.rand(size, 2) * [W, H]
+    colors = rng.rand(size, 4)
+    makers = [
+        lambda p, c: gz.square(20, xy=p, angle=c[0], fill=c[:3], stroke_width=1),
+        lambda p, c: gz.circle(8, xy=p, fill=c, stroke=(0, 0, 0.5), stroke_width=2),
+        lambda p, c: gz.star(5, 12, 0.5, xy=p, fill=c, stroke_width=0.5),
+        lambda p, c: gz.polyline(
+            [p, p + [20, 5], p + [5, 20]], stroke=c[:3], stroke_width=3
+        ),
+    ]
+    elements = [makers[i % 4](p, c) for i, (p, c) in enumerate(zip(xy, colors))]
+    for i in range(0, size, 100):
+        elements.append(gz.text(f"Gizeh {i}", "Sans", 14, xy=xy[i], angle=0.2))
+    return elements
+
+
+def _draw_all(elements):
+    def draw(surface):
+        for element in elements:
+            element.draw(surface)
+
+    return draw
+
+
+@equivalence(max_diff=0)
+def group_vs_separate_draws(size):
+    elements = _scene(size)
+    return (
+        lambda: _render(_draw_all(elements)),
+        lambda: _render(gz.Group(elements).draw),
+    )
+
+
+@equivalence(max_diff=0)
+def sorted_group_vs_group(size):
+    side = int(np.ceil(np.sqrt(size)))
+    cell = min(W, H) / side
+    colors = [(1, 0, 0), (0, 0.5, 0), (0, 0, 1, 0.5)]
+    squares = [
+        gz.square(
+            0.6 * cell,
+            xy=((i + 0.5) * cell, (j + 0.5) * cell),
+            fill=colors[(i + 2 * j) % 3],
+            stroke_width=0.05 * cell,
+        )
+        for i in range(side)
+        for j in range(side)
+    ][:size]
+    return (
+        lambda: _render(gz.Group(squares).draw),
+        lambda: _render(gz.Group(squares, sort_by_style=True).draw),
+    )
+
+
+@equivalence(max_diff=4, mean_diff=0.1)
+def instances_vs_copies(size):
+    # Instances append a copy of the path, in cairo's fixed point format:
+    # antialiased edges may differ slightly.
+    rng = np.random.RandomState(123)
+    xy, angles, colors = rng.rand(size, 2) * [W, H], rng.rand(size), rng.rand(size, 4)
+    marker = gz.star(5, 10, 0.5, stroke_width=1)
+    copies = [
+        gz.star(5, 10, 0.5, xy=p, angle=a, fill=c, stroke_width=1)
+        for p, a, c in zip(xy, angles, colors)
+    ]
+    instances = gz.instances(marker, xy=xy, angle=angles, fills=colors)
+    return (
+        lambda: _render(gz.Group(copies).draw),
+        lambda: _render(instances.draw),
+    )
+
+
+@equivalence(max_diff=2, mean_diff=0.05)
+def recording_replay_vs_direct(size):
+    elements = _scene(size)
+    recording = gz.RecordingSurface(W, H, bg_color=(1, 1, 1))
+    gz.Group(elements).draw(recording)
+    return (
+        lambda: _render(gz.Group(elements).draw),
+        lambda: _render(recording.replay),
+    )
+
+
+@equivalence(max_diff=255, mean_diff=3)
+def preview_vs_downscaled(size):
+    # Rasterizing at a lower resolution approximates the coverage of the
+    # pixels differently: only the mean difference is meaningful.
+    elements = gz.Group(_scene(size))
+
+    def downscaled():
+        full = _render(elements.draw).astype(float)
+        blocks = full.reshape(H // 4, 4, W // 4, 4, 3).mean(axis=(1, 3))
+        return np.round(blocks).astype(np.uint8)
+
+    return downscaled, lambda: _render(elements.draw, scale=0.25)
+
+
+@equivalence(max_diff=0)
+def clip_vs_overpaint(size):
+    # Drawing everything then covering the outside of a window with the
+    # background, versus clipping (and culling the shapes outside).
+    elements = _scene(size)
+    x1, y1, x2, y2 = 160, 120, 480, 360
+    outside = [
+        gz.rectangle(W, y1, xy=(W / 2, y1 / 2), fill=(1, 1, 1)),
+        gz.rectangle(W, H - y2, xy=(W / 2, (H + y2) / 2), fill=(1, 1, 1)),
+        gz.rectangle(x1, y2 - y1, xy=(x1 / 2, (y1 + y2) / 2), fill=(1, 1, 1)),
+        gz.rectangle(W - x2, y2 - y1, xy=((W + x2) / 2, (y1 + y2) / 2), fill=(1, 1, 1)),
+    ]
+    window = gz.rectangle(x2 - x1, y2 - y1, xy=((x1 + x2) / 2, (y1 + y2) / 2))
+    return (
+        lambda: _render(gz.Group(elements + outside).draw),
+        lambda: _render(gz.Group(elements, clip=window).draw),
+    )
+
+
+@equivalence(max_diff=0)
+def atlas_vs_image_patterns(size):
+    rng = np.random.RandomState(123)
+    icons = [rng.randint(0, 256, (16, 16, 4)).astype(np.uint8) for _ in range(50)]
+    positions = rng.randint(0, [W, H], size=(size, 2))
+
+    def draw_icons(patterns):
+        shapes = [
+            gz.square(16, xy=p, fill=patterns[i % len(patterns)])
+            for i, p in enumerate(positions)
+        ]
+        return _render(gz.Group(shapes).draw)
+
+    def separate():
+        return draw_icons(
+            [gz.ImagePattern(icon, (8, 8), filter="nearest") for icon in icons]
+        )
+
+    def atlas():
+        atlas = gz.ImageAtlas(icons, filter="nearest")
+        return draw_icons([atlas.pattern(i, (8, 8)) for i in range(len(icons))])
+
+    return separate, atlas
+
+
+@equivalence(max_diff=0)
+def numpy_fill_vs_image_pattern(size):
+    # A new ImagePattern (i.e. conversion) per shape, versus a same cached
+    # numpy image. Integer positions make the patterns' filters irrelevant.
+    rng = np.random.RandomState(123)
+    image = rng.randint(0, 256, (32, 32, 3)).astype(np.uint8)
+    positions = rng.randint(0, [W, H], size=(size, 2))
+
+    def draw_squares(make_fill):
+        shapes = [gz.square(32, xy=p, fill=make_fill()) for p in positions]
+        return _render(gz.Group(shapes).draw)
+
+    return (
+        lambda: draw_squares(lambda: gz.ImagePattern(image)),
+        lambda: draw_squares(lambda: image),
+    )
+
+
+@equivalence(max_diff=2, mean_diff=0.05)
+def timeline_vs_direct(size):
+    # Cached layers are composited as 8-bit rasters (see gizeh.timeline).
+    background = gz.Group(_scene(size))
+
+    def ball(t):
+        return gz.circle(20, xy=(40 + 100 * t, H / 2), fill=(1, 0, 0, 0.7))
+
+    timeline = gz.Timeline(
+        [gz.Layer(background), gz.Layer(ball)], W, H, bg_color=(1, 1, 1)
+    )
+    return (
+        lambda: _render(timeline.element_at(1.5).draw),
+        lambda: timeline.make_frame(1.5),
+    )
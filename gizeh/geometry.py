@@ -1,5 +1,13 @@
+from collections import OrderedDict
+from itertools import chain
+from math import sqrt
+
 import numpy as np
 
+# Maximal number of entries of each shape geometry cache.
+GEOMETRY_CACHE_SIZE = 1024
+_geometry_caches = {}
+
 
 def rotation_matrix(a):
     """Return a 3x3 2D geometric rotation matrix"""
@@ -18,16 +26,98 @@ def scaling_matrix(sx, sy):
     return np.array([[sx, 0, 0], [0, sy, 0], [0, 0, 1]])
 
 
+def rotation_matrices(angles):
+    """Return a (N,3,3) stack of 2D rotation matrices, one per angle"""
+    angles = np.asarray(angles, dtype=float)
+    cos, sin = np.cos(angles), np.sin(angles)
+    mats = np.zeros(angles.shape + (3, 3))
+    mats[..., 0, 0], mats[..., 0, 1] = cos, -sin
+    mats[..., 1, 0], mats[..., 1, 1] = sin, cos
+    mats[..., 2, 2] = 1.0
+    return mats
+
+
+def translation_matrices(xy):
+    """Return a (N,3,3) stack of 2D translation matrices from a (N,2) array"""
+    xy = np.asarray(xy, dtype=float)
+    mats = np.zeros(xy.shape[:-1] + (3, 3))
+    mats[..., [0, 1, 2], [0, 1, 2]] = 1.0
+    mats[..., :2, 2] = xy
+    return mats
+
+
+def scaling_matrices(sx, sy=None):
+    """Return a (N,3,3) stack of 2D scaling matrices.
+
+    `sx` and `sy` are arrays of N scales (or numbers). If `sy` is not
+    provided it is assumed that sy=sx.
+    """
+    sx = np.asarray(sx, dtype=float)
+    sy = sx if sy is None else np.asarray(sy, dtype=float)
+    sx, sy = np.broadcast_arrays(sx, sy)
+    mats = np.zeros(sx.shape + (3, 3))
+    mats[..., 0, 0], mats[..., 1, 1], mats[..., 2, 2] = sx, sy, 1.0
+    return mats
+
+
+def transform_matrices(xy=None, angle=None, scale=None):
+    """Return a (N,3,3) stack of matrices which scale, then rotate, then
+    translate, like the parameters `xy` and `angle` of the shapes.
+
+    xy
+      (N,2) array of translations.
+
+    angle
+      Array of N rotation angles (in radians).
+
+    scale
+      Array of N scales, or (N,2) array of (sx, sy) scales.
+
+    Parameters which are not provided are ignored, and N is deduced from the
+    others.
+    """
+    mats = np.eye(3)
+    if scale is not None:
+        scale = np.asarray(scale, dtype=float)
+        if scale.ndim == 2:
+            mats = scaling_matrices(scale[..., 0], scale[..., 1])
+        else:
+            mats = scaling_matrices(scale)
+    if angle is not None:
+        mats = np.matmul(rotation_matrices(angle), mats)
+    if xy is not None:
+        mats = np.matmul(translation_matrices(xy), mats)
+    return mats
+
+
+def transform_points(matrices, points):
+    """Apply 3x3 transformation matrices to (x,y) points, in one call.
+
+    `matrices` is a 3x3 matrix or a (N,3,3) stack, `points` a (2,) point or
+    a (N,2) array of points, and the usual numpy broadcasting rules apply:
+    one matrix transforms N points, N matrices transform one point each, or
+    N matrices transform N points pairwise. For all the combinations of N
+    matrices and M points, use ``transform_points(mats[:, None], points)``
+    which returns a (N,M,2) array.
+    """
+    matrices = np.asarray(matrices, dtype=float)
+    points = np.asarray(points, dtype=float)
+    linear = np.matmul(matrices[..., :2, :2], points[..., None])[..., 0]
+    return linear + matrices[..., :2, 2]
+
+
 def polar_polygon(nfaces, radius, npoints):
-    """Returns the (x,y) coordinates of n points regularly spaced
-    along a regular polygon of `nfaces` faces and given radius.
+    """Returns the (r, theta, d) coordinates of n points regularly spaced
+    along a regular polygon of `nfaces` faces and given radius, as a (n,3)
+    array, where d is the relative distance to the first point along the
+    polygon.
     """
     theta = np.linspace(0, 2 * np.pi, npoints)[:-1]
     cos, pi, n = np.cos, np.pi, nfaces
     r = cos(pi / n) / cos((theta % (2 * pi / n)) - pi / n)
     d = np.cumsum(np.sqrt((r[1:] - r[:-1]) ** 2))
-    d = [0] + list(d / d.max())
-    return zip(radius * r, theta, d)
+    d = np.concatenate([[0], d / d.max()])
+    return np.stack([radius * r, theta, d], axis=1)
 
 
 def polar2cart(r, theta):
@@ -38,3 +128,123 @@ def polar2cart(r, theta):
 
     res = r * np.array([np.cos(theta), np.sin(theta)])
     return res if len(res.shape) == 1 else res.T
+
+
+class _GeometryCache:
+    """LRU cache of the results of a geometry function, keyed on its
+    arguments. Calls with unhashable arguments (e.g. arrays) are not cached.
+    """
+
+    def __init__(self, func, maxsize):
+        self.func = func
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._results = OrderedDict()
+
+    def __call__(self, *args):
+        try:
+            result = self._results[args]
+        except KeyError:
+            self.misses += 1
+            result = self._results[args] = self.func(*args)
+            if len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+            return result
+        except TypeError:  # unhashable arguments
+            return self.func(*args)
+        self.hits += 1
+        self._results.move_to_end(args)
+        return result
+
+    def info(self):
+        calls = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / calls if calls else 0.0,
+            "size": len(self._results),
+            "maxsize": self.maxsize,
+        }
+
+    def clear(self):
+        self._results.clear()
+        self.hits = self.misses = 0
+
+
+def _cached_geometry(func):
+    """Decorator memoizing a function returning immutable shape geometry."""
+    cache = _GeometryCache(func, GEOMETRY_CACHE_SIZE)
+    cache.__doc__ = func.__doc__
+    _geometry_caches[func.__name__] = cache
+    return cache
+
+
+def geometry_cache_info():
+    """Return the statistics (hits, misses, hit_rate, size, maxsize) of the
+    caches of shape geometry, as a dict ``{function_name: statistics}``."""
+    return {name: cache.info() for name, cache in _geometry_caches.items()}
+
+
+def set_geometry_cache_size(maxsize):
+    """Set the maximal number of entries of each shape geometry cache."""
+    for cache in _geometry_caches.values():
+        cache.maxsize = maxsize
+        while len(cache._results) > maxsize:
+            cache._results.popitem(last=False)
+
+
+def clear_geometry_cache():
+    """Empty the shape geometry caches and reset their statistics."""
+    for cache in _geometry_caches.values():
+        cache.clear()
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+@_cached_geometry
+def regular_polygon_points(r, n):
+    """Return the (n,2) read-only array of the vertices of a regular polygon
+    of radius r with n sides, centered on (0,0)."""
+    return _read_only(polar2cart(r, np.linspace(0, 2 * np.pi, n + 1)[:-1]))
+
+
+@_cached_geometry
+def star_points(nbranches, radius, ratio):
+    """Return the (2*nbranches,2) read-only array of the vertices of a star
+    centered on (0,0)."""
+    rr = radius * np.array(nbranches * [1.0, ratio])
+    aa = np.linspace(0, 2 * np.pi, 2 * nbranches + 1)[:-1]
+    return _read_only(polar2cart(rr, aa))
+
+
+@_cached_geometry
+def ellipse_curves(w, h):
+    """Return the start point and the four Bezier curves approximating an
+    ellipse of width w and height h centered on (0,0), as arguments of cairo's
+    ``move_to`` and ``curve_to``: ``((x, y), ((x1, y1, x2, y2, x3, y3), ...))``
+    """
+    # Bezier control points for a quarter of an ellipse.
+    ctrl_pnts = [
+        ((w / 2), 0),
+        ((w / 2), (h / 2) * (4 / 3) * (sqrt(2) - 1)),
+        ((w / 2) * (4 / 3) * (sqrt(2) - 1), (h / 2)),
+        (0, (h / 2)),
+    ]
+
+    # Create a list, all_points, which will be populated with lists of control
+    # points for 4 Bezier curves that will approximate the ellipse.
+    all_points = []
+    for i in [1, -1]:
+        for j in [1, -1]:
+            all_points.append([(pnt[0] * i, pnt[1] * (-j)) for pnt in ctrl_pnts])
+    # Permutes the last three lists to put the curves in correct order
+    all_points.append(all_points.pop(1))
+    # Correct the order of the two sublists defining their respective quarter
+    # pieces of the ellipse so that the whole ellipse is drawn in order
+    all_points[1].reverse()
+    all_points[3].reverse()
+    curves = tuple(tuple(chain(*points))[2:] for points in all_points)
+    return ctrl_pnts[0], curves
@@ -1,21 +1,71 @@
+import threading
+import weakref
+import zlib
 from base64 import b64encode
-from copy import copy, deepcopy
-from itertools import chain
-from math import sqrt
+from collections import OrderedDict
+from copy import copy
+from io import BytesIO
+from itertools import chain, repeat
 
-import cairocffi as cairo
 import numpy as np
 
-from .geometry import polar2cart, rotation_matrix, scaling_matrix, translation_matrix
+from . import profiling as _profiling
+from .geometry import (
+    ellipse_curves,
+    regular_polygon_points,
+    rotation_matrix,
+    scaling_matrix,
+    star_points,
+    transform_matrices,
+    translation_matrix,
+)
+from .tools import parse_color, parse_colors, premultiply_alpha, unpremultiply_alpha
+
+
+def _load_cairo():
+    """Import cairocffi, fill the tables of line caps and joins, and return
+    the module. The module replaces the _LazyCairo proxy in the globals."""
+    global cairo
+    import cairocffi
+
+    if not _LINE_CAPS:
+        _LINE_CAPS.update(
+            {
+                None: cairocffi.LINE_CAP_BUTT,  # cairo's default
+                "butt": cairocffi.LINE_CAP_BUTT,
+                "round": cairocffi.LINE_CAP_ROUND,
+                "square": cairocffi.LINE_CAP_SQUARE,
+            }
+        )
+        _LINE_JOINS.update(
+            {
+                None: cairocffi.LINE_JOIN_MITER,  # cairo's default
+                "cut": cairocffi.LINE_JOIN_BEVEL,
+                "square": cairocffi.LINE_JOIN_MITER,
+                "round": cairocffi.LINE_JOIN_ROUND,
+            }
+        )
+    cairo = cairocffi
+    return cairocffi
 
-try:
-    from cStringIO import StringIO
-except ImportError:
-    try:
-        from StringIO import StringIO
-    except ImportError:
-        # Python 3 compatibility
-        from io import BytesIO as StringIO
+
+class _LazyCairo:
+    """Stands for the cairocffi module until it is first used.
+
+    Importing cairocffi loads the native cairo library, which takes time and
+    is only needed to draw: the module is imported (see _load_cairo) on the
+    first access to one of its attributes, e.g. when a Surface is created.
+    """
+
+    def __getattr__(self, name):
+        return getattr(_load_cairo(), name)
+
+
+cairo = _LazyCairo()
+
+# Cairo's line caps and joins, filled by _load_cairo.
+_LINE_CAPS = {}
+_LINE_JOINS = {}
 
 
 class Surface:
@@ -27,28 +77,51 @@ class Surface:
     Note that this class is simply a thin wrapper around Cairo's Surface class.
     """
 
-    def __init__(self, width, height, bg_color=None):
-        """ "Initialize."""
+    def __init__(self, width, height, bg_color=None, scale=1.0):
+        """Initialize.
+
+        `width` and `height` are the dimensions of the drawing area, in the
+        coordinates used by the elements. The surface is rasterized at
+        `scale` pixels per unit, so ``Surface(800, 600, scale=0.25)`` is a
+        200x150 image of the same scene (strokes and text scale along).
+        """
         self.width = width
         self.height = height
-        self._cairo_surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+        self.scale = scale
+        self.bg_color = bg_color
+        self._cairo_surface = cairo.ImageSurface(
+            cairo.FORMAT_ARGB32,
+            max(1, int(round(width * scale))),
+            max(1, int(round(height * scale))),
+        )
+        if scale != 1:
+            self._cairo_surface.set_device_scale(scale, scale)
         if bg_color:
             rectangle(2 * width, 2 * height, fill=bg_color).draw(self)
 
     @staticmethod
     def from_image(image):
-        """Initialize the surface from an np array of an image."""
-        h, w, d = image.shape
+        """Initialize the surface from an np array of an image.
+
+        The image is a (H,W) or (H,W,1) grayscale, (H,W,3) RGB or (H,W,4)
+        RGBA array of uint8 values. RGBA images have a straight (i.e. not
+        premultiplied) alpha, as returned by ``get_npimage(transparent=True)``.
+        """
+        h, w = image.shape[:2]
+        d = 1 if image.ndim == 2 else image.shape[2]
+        # Cairo's pixels are premultiplied BGRA
+        bgra = np.empty((h, w, 4), dtype=np.uint8)
         if d == 4:
-            image = image[:, :, [2, 1, 0, 3]]
-        if d == 1:
-            image = np.array(3 * [image])
-        elif d == 3:
-            image = image[:, :, [2, 1, 0]]
-            image = np.dstack([image, 255 * np.ones((h, w))])
+            bgra[...] = image[:, :, [2, 1, 0, 3]]
+            premultiply_alpha(bgra, out=bgra)
+        else:
+            bgra[:, :, :3] = image.reshape(h, w, d)[:, :, ::-1]
+            bgra[:, :, 3] = 255
+        if _profiling.current is not None:
+            _profiling.current.count("bytes", bgra.nbytes)
         sf = Surface(w, h)
         arr = np.frombuffer(sf._cairo_surface.get_data(), np.uint8)
-        arr += image.flatten()
+        arr[:] = bgra.ravel()
         sf._cairo_surface.mark_dirty()
         return sf
 
@@ -56,6 +129,38 @@ class Surface:
         """Return a new context for drawing on the surface."""
         return cairo.Context(self._cairo_surface)
 
+    def render(self, elements):
+        """Draw an Element, or a list of Elements in order, on the surface."""
+        if isinstance(elements, Element):
+            elements = [elements]
+        for element in elements:
+            element.draw(self)
+        return self
+
+    async def render_async(self, elements, renderer=None):
+        """Draw elements like ``render``, in a thread pool.
+
+        Use ``await surface.render_async(elements)`` in asyncio code to avoid
+        blocking the event loop. See ``gizeh.AsyncRenderer`` for the `renderer`
+        (thread pool, concurrency limit) used, and cancellation.
+        """
+        from .aio import default_renderer
+
+        return await (renderer or default_renderer()).render(self, elements)
+
+    def preview(self, elements, scale=0.25):
+        """Return a low-resolution rendering of the given elements.
+
+        The result is a new Surface with the same dimensions and background
+        as this one, rasterized directly at `scale` times its resolution
+        (rather than rendered at full size and downscaled). This is much
+        faster for quick previews of large frames.
+        """
+        preview = Surface(
+            self.width, self.height, bg_color=self.bg_color, scale=self.scale * scale
+        )
+        return preview.render(elements)
+
     def write_to_png(self, filename, y_origin="top"):
         """Write the image to a PNG.
 
@@ -65,7 +170,7 @@ class Surface:
 
         if y_origin == "bottom":
             W, H = self.width, self.height
-            new_surface = Surface(W, H)
+            new_surface = Surface(W, H, scale=self.scale)
             rect = (
                 rectangle(2 * W, 2 * H, fill=ImagePattern(self))
                 .scale(1, -1)
@@ -76,23 +181,52 @@ class Surface:
         else:
             self._cairo_surface.write_to_png(filename)
 
+    def to_png_bytes(self, y_origin="top"):
+        """Return the PNG data of the image, as bytes.
+
+        Parameter y_origin ("top" or "bottom") decides whether point (0,0)
+        lies in the top-left or bottom-left corner of the screen.
+        """
+        data = BytesIO()
+        self.write_to_png(data, y_origin=y_origin)
+        return data.getvalue()
+
+    async def to_png_bytes_async(self, y_origin="top", renderer=None):
+        """Return the PNG data like ``to_png_bytes``, encoded in a thread
+        pool (see ``render_async``)."""
+        from .aio import default_renderer
+
+        renderer = renderer or default_renderer()
+        return await renderer.to_png_bytes(self, y_origin=y_origin)
+
     def get_npimage(self, transparent=False, y_origin="top"):
         """Returns a WxHx[3-4] numpy array representing the RGB picture.
 
         If `transparent` is True the image is WxHx4 and represents a RGBA
         picture, i.e. array[i,j] is the [r,g,b,a] value of the pixel at
-        position [i,j]. If `transparent` is false, a RGB array is returned.
+        position [i,j], with a straight (not premultiplied) alpha. If
+        `transparent` is false, a RGB array is returned, where transparent
+        pixels are blended over black.
 
         Parameter y_origin ("top" or "bottom") decides whether point (0,0)
         lies in the top-left or bottom-left corner of the screen.
         """
 
-        im = 0 + np.frombuffer(self._cairo_surface.get_data(), np.uint8)
-        im.shape = (self.height, self.width, 4)
-        im = im[:, :, [2, 1, 0, 3]]  # put RGB back in order
+        cs = self._cairo_surface
+        # A view on cairo's data: the reordering of the channels copies it.
+        im = np.frombuffer(cs.get_data(), np.uint8)
+        im = im.reshape(cs.get_height(), cs.get_width(), 4)
+        if _profiling.current is not None:
+            _profiling.current.count("bytes", im.nbytes)
         if y_origin == "bottom":
             im = im[::-1]
-        return im if transparent else im[:, :, :3]
+        if not transparent:
+            return im[:, :, [2, 1, 0]]  # put RGB back in order
+        # The channels are reordered into a new (C-contiguous) array, in which
+        # the alpha is then unpremultiplied in place.
+        rgba = np.empty(im.shape, dtype=np.uint8)
+        np.take(im, [2, 1, 0, 3], axis=2, out=rgba, mode="clip")
+        return unpremultiply_alpha(rgba, out=rgba)
 
     def get_html_embed_code(self, y_origin="top"):
         """Return an html code containing all the PNG data of the surface."""
@@ -116,21 +250,34 @@ class Surface:
 
     def _repr_png_(self):
         """Return the raw PNG data to be displayed in the IPython notebook."""
-        data = StringIO()
-        self.write_to_png(data)
-        return data.getvalue()
+        return self.to_png_bytes()
 
 
-class PDFSurface:
-    """Simple class to allow Gizeh to create PDF figures."""
+class _VectorSurface:
+    """Base of the surfaces writing vector files (PDFSurface, SVGSurface):
+    the drawing interface of Surface, and use as a context manager which
+    finishes the file on exit."""
+
+    _cairo_surface_class = None  # name of the cairocffi class
 
     def __init__(self, name, width, height, bg_color=None):
         self.width = width
         self.height = height
-        self._cairo_surface = cairo.PDFSurface(name, width, height)
+        self.bg_color = bg_color
+        surface_class = getattr(cairo, self._cairo_surface_class)
+        self._cairo_surface = surface_class(name, width, height)
+        self._page_is_blank = True
+        self._pages_done = 0
 
     def get_new_context(self):
         """Return a new context for drawing on the surface."""
+        if self._page_is_blank:
+            # The background is painted lazily so that the page size can
+            # still be changed until something is drawn on the page.
+            self._page_is_blank = False
+            if self.bg_color:
+                W, H = self.width, self.height
+                rectangle(2 * W, 2 * H, fill=self.bg_color).draw(self)
         return cairo.Context(self._cairo_surface)
 
     def flush(self):
@@ -139,8 +286,141 @@ class PDFSurface:
 
     def finish(self):
         """Close the surface"""
+        if self._page_is_blank and self._pages_done == 0:
+            self.get_new_context()  # a document has at least one page
         self._cairo_surface.finish()
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.finish()
+
+
+class PDFSurface(_VectorSurface):
+    """Class to allow Gizeh to create (multi-page) PDF figures.
+
+    Pages are written to the file as they are completed, so memory use stays
+    flat whatever the number of pages. Typical use::
+
+        with PDFSurface("report.pdf", 595, 842, bg_color=(1, 1, 1)) as pdf:
+            for page in pages:
+                page.draw(pdf)
+                pdf.new_page()
+
+    Parameters
+    ------------
+    name
+      Name of the PDF file, or a writable file-like object.
+
+    width, height
+      Dimensions of the pages, in points (1/72 inch). They can be changed
+      with ``set_size`` or ``new_page`` for the pages to come.
+
+    bg_color
+      Background color painted on every page. Default is None (no background).
+    """
+
+    _cairo_surface_class = "PDFSurface"
+
+    def set_size(self, width, height):
+        """Change the size of the pages, starting with the current page.
+
+        This must be called before anything is drawn on the current page, e.g.
+        right after ``new_page()``.
+        """
+        self.width = width
+        self.height = height
+        self._cairo_surface.set_size(width, height)
+
+    def new_page(self, width=None, height=None):
+        """Finish the current page and start a new one.
+
+        The finished page is flushed to the file. If `width` and `height` are
+        provided, the new page gets these dimensions.
+        """
+        if self._page_is_blank:
+            self.get_new_context()  # paints the background of empty pages
+        self._cairo_surface.show_page()
+        self._cairo_surface.flush()
+        self._page_is_blank = True
+        self._pages_done += 1
+        if width is not None:
+            self.set_size(width, height)
+
+
+class SVGSurface(_VectorSurface):
+    """Class to allow Gizeh to create SVG figures.
+
+    It has the same drawing interface as PDFSurface, but an SVG file holds a
+    single image of a fixed size: it has no ``new_page`` or ``set_size``.
+
+    Parameters
+    ------------
+    name
+      Name of the SVG file, or a writable file-like object.
+
+    width, height
+      Dimensions of the image, in points (1/72 inch).
+
+    bg_color
+      Background color of the image. Default is None (no background).
+    """
+
+    _cairo_surface_class = "SVGSurface"
+
+
+class RecordingSurface:
+    """A surface which records the drawing operations performed on it, so
+    that they can be replayed on any other surface.
+
+    The elements are evaluated only once, when drawn on the recording surface.
+    Replaying onto a Surface (of any `scale`), a PDFSurface or an SVGSurface
+    is then done by Cairo alone, e.g. to export a same scene to a thumbnail,
+    a full-size PNG and a PDF.
+
+    Parameters
+    ------------
+    width, height
+      Dimensions of the recorded area. If not provided, the recording is
+      unbounded.
+
+    bg_color
+      Background color of the recording. Default is None (transparent).
+    """
+
+    def __init__(self, width=None, height=None, bg_color=None):
+        self.width = width
+        self.height = height
+        extents = None if width is None else (0, 0, width, height)
+        self._cairo_surface = cairo.RecordingSurface(cairo.CONTENT_COLOR_ALPHA, extents)
+        if bg_color:
+            ctx = self.get_new_context()
+            _set_source(ctx, bg_color)
+            ctx.paint()
+
+    def get_new_context(self):
+        """Return a new context for drawing on the surface."""
+        return cairo.Context(self._cairo_surface)
+
+    def ink_extents(self):
+        """Return the (x, y, width, height) box containing everything drawn."""
+        return self._cairo_surface.ink_extents()
+
+    def replay(self, surface, matrix=None):
+        """Draw the recorded operations on the given surface.
+
+        Parameter `matrix` is an optional 3x3 transformation matrix (see for
+        instance ``gizeh.scaling_matrix``) applied to the recording.
+        Returns the surface.
+        """
+        ctx = surface.get_new_context()
+        if matrix is not None:
+            ctx.set_matrix(_cairo_matrix(matrix))
+        ctx.set_source_surface(self._cairo_surface, 0, 0)
+        ctx.paint()
+        return surface
+
 
 class Element:
     """Base class for objects that can be transformed (rotated, translated,
@@ -149,17 +429,31 @@ class Element:
     Parameter `draw_method` is a function which takes a cairo.Surface.Context()
     as argument and draws on this context. All Elements are draw on a different
     context.
+
+    Parameter `kind` is the type of element (e.g. "rectangle") used to label
+    the element when profiling. Default is the name of the draw method.
+
+    Elements are never modified in place (transformations return copies) so
+    copies share their draw method and the identity matrix, and use slots
+    instead of a __dict__, to keep scenes of millions of elements small.
     """
 
-    def __init__(self, draw_method):
+    __slots__ = ("draw_method", "matrix", "kind")
+
+    def __init__(self, draw_method, kind=None):
         """Initialize."""
         self.draw_method = draw_method
-        self.matrix = 1.0 * np.eye(3)
+        self.matrix = _IDENTITY
+        if kind is None:
+            kind = getattr(draw_method, "__name__", "Element")
+        self.kind = kind
+
+    def _profile_label(self):
+        return self.kind
 
     def _cairo_matrix(self):
         """Return the element's matrix in cairo form"""
-        m = self.matrix
-        return cairo.Matrix(m[0, 0], m[1, 0], m[0, 1], m[1, 1], m[0, 2], m[1, 2])
+        return _cairo_matrix(self.matrix)
 
     def _transform_ctx(self, ctx):
         """Tranform the context before drawing.
@@ -170,13 +464,58 @@ class Element:
 
     def draw(self, surface):
         """Draw the Element on a new context of the given Surface"""
+        if _profiling.current is None:
+            self._draw(surface)
+        else:
+            profiler = _profiling.current
+            profiler.enter(self)
+            try:
+                self._draw(surface)
+            finally:
+                profiler.exit()
+
+    def _draw(self, surface):
         ctx = surface.get_new_context()
+        if _profiling.current is not None:
+            _profiling.current.count("contexts")
         self._transform_ctx(ctx)
         self.draw_method(ctx)
 
+    def _render(self, ctx, matrix, state):
+        """Draw the element with the given matrix on a context shared with
+        other elements (see Group), whose state is tracked by `state`."""
+        draw_method = self.draw_method
+        if isinstance(draw_method, _ShapeDraw):
+            ctx.set_matrix(_cairo_matrix(matrix))
+            ctx.new_path()
+            draw_method.render(ctx, state)
+        elif type(self).draw is not Element.draw:  # subclass with custom draw
+            # The "new" contexts it gets are the shared context in its default
+            # state, so that the clips and masks of the groups apply to it.
+            ctx.save()
+            state.reset()
+            ctx.identity_matrix()
+            ctx.save()
+            try:
+                self.set_matrix(matrix).draw(_SharedContextSurface(ctx, state.surface))
+            finally:
+                ctx.restore()
+                ctx.restore()
+        else:
+            # Other draw methods expect a new context: give them one in its
+            # default state, then undo their changes.
+            ctx.save()
+            state.reset()
+            ctx.set_matrix(_cairo_matrix(matrix))
+            ctx.new_path()
+            draw_method(ctx)
+            ctx.restore()
+
     def set_matrix(self, new_mat):
         """Return a copy of the element, with a new transformation matrix"""
-        new = deepcopy(self)
+        if _profiling.current is not None:
+            _profiling.current.count("copies")
+        new = copy(self)
         new.matrix = new_mat
         return new
 
@@ -231,21 +570,228 @@ class Group(Element):
     Class for special Elements made out of a group of other elements which
     will be translated, scaled, rotated, and drawn together.
     These elements can be base elements (circles, squares) or even groups.
+
+    All the elements of a group are drawn on a same cairo context, and
+    changes of source and line style which would be redundant (e.g. between
+    shapes of a same color) are skipped.
+
+    Parameter `name` is optional and identifies the group when profiling.
+
+    Parameter `sort_by_style`, if True, reorders the shapes of the group so
+    that shapes with the same style are drawn consecutively, which saves
+    context state changes. Only use it if the order in which these shapes are
+    drawn doesn't matter (e.g. they don't overlap). Non-shape elements (text,
+    groups...) are never moved, and shapes are not moved across them.
+
+    Parameter `clip` is a shape (e.g. a circle) whose contour, transformed
+    with the group, limits the drawing of the group's elements. Its fill and
+    stroke are ignored. The shapes of a clipped group (including in nested
+    groups) which lie entirely outside of the clip are not drawn at all.
+
+    Parameter `mask` is an Element (e.g. a shape filled with a gradient)
+    whose transparency is applied to the group: the group is only visible
+    where the mask is drawn, and as opaque as the mask.
     """
 
-    def __init__(self, elements):
-        """Initialize."""
+    __slots__ = ("elements", "name", "sort_by_style", "clip", "mask")
 
+    def __init__(self, elements, name=None, sort_by_style=False, clip=None, mask=None):
+        """Initialize."""
+        if clip is not None and not isinstance(
+            getattr(clip, "draw_method", None), _ShapeDraw
+        ):
+            raise ValueError("The clip of a Group must be a shape.")
         self.elements = elements
-        self.matrix = 1.0 * np.eye(3)
+        self.matrix = _IDENTITY
+        self.name = name
+        self.sort_by_style = sort_by_style
+        self.clip = clip
+        self.mask = mask
 
-    def draw(self, surface):
-        """Draw the group to a new context of the given Surface"""
+    def _profile_label(self):
+        return "Group" if self.name is None else f"Group[{self.name}]"
 
-        for e in self.elements:
-            m = self.matrix
-            new_matrix = m.dot(e.matrix)
-            e.set_matrix(new_matrix).draw(surface)
+    def _draw(self, surface):
+        ctx = surface.get_new_context()
+        if _profiling.current is not None:
+            _profiling.current.count("contexts")
+        self._render(ctx, self.matrix, _DrawState(ctx, surface))
+
+    def _render(self, ctx, matrix, state):
+        if self.clip is None and self.mask is None:
+            self._render_elements(ctx, matrix, state)
+            return
+        # Clips and masks are undone with ctx.restore(), which also reverts
+        # the changes of source and line style made by the elements: these
+        # are tracked on copies of the state.
+        ctx.save()
+        inner_state = state.copy()
+        if self.clip is not None:
+            inner_state.bounds = self._apply_clip(ctx, matrix, state.bounds)
+        if self.mask is None:
+            self._render_elements(ctx, matrix, inner_state)
+        else:
+            ctx.push_group()
+            self._render_elements(ctx, matrix, inner_state)
+            ctx.identity_matrix()
+            content = ctx.pop_group()
+            ctx.push_group()
+            self.mask._render(ctx, matrix.dot(self.mask.matrix), state.copy())
+            ctx.identity_matrix()
+            mask = ctx.pop_group()
+            ctx.set_source(content)
+            ctx.mask(mask)
+        ctx.restore()
+
+    def _apply_clip(self, ctx, matrix, bounds):
+        """Clip the context with the group's clip shape and return the new
+        culling bounds (the extents of the clip, in the context's default
+        user space)."""
+        clip_matrix = matrix.dot(self.clip.matrix)
+        path = self.clip.draw_method.copy_path(ctx, _path_scale(clip_matrix))
+        ctx.set_matrix(_cairo_matrix(clip_matrix))
+        ctx.new_path()
+        ctx.append_path(path)
+        ctx.clip()
+        ctx.identity_matrix()
+        x1, y1, x2, y2 = ctx.clip_extents()
+        if bounds is not None:
+            x1, y1 = max(x1, bounds[0]), max(y1, bounds[1])
+            x2, y2 = min(x2, bounds[2]), min(y2, bounds[3])
+        return (x1, y1, x2, y2)
+
+    def _render_elements(self, ctx, matrix, state):
+        elements = self.elements
+        if self.sort_by_style:
+            elements = _sort_by_style(elements)
+        profiler = _profiling.current
+        bounds, cancelled = state.bounds, state.cancelled
+        for e in elements:
+            if cancelled is not None and cancelled.is_set():
+                return
+            e_matrix = matrix.dot(e.matrix)
+            if bounds is not None and _is_culled(e, ctx, e_matrix, bounds):
+                continue
+            if profiler is None:
+                e._render(ctx, e_matrix, state)
+            else:
+                profiler.enter(e)
+                try:
+                    e._render(ctx, e_matrix, state)
+                finally:
+                    profiler.exit()
+
+
+def _path_scale(matrices):
+    """Return the largest scale factor (at least 1) of the matrices, i.e. how
+    much paths built for them should be subdivided."""
+    linear = np.abs(np.asarray(matrices)[..., :2, :2])
+    return max(1.0, linear.sum(axis=-2).max(initial=0))
+
+
+def _is_culled(element, ctx, matrix, bounds):
+    """Return whether the element (drawn with the given matrix) lies entirely
+    outside the bounds. Only shapes can be culled."""
+    draw_method = getattr(element, "draw_method", None)
+    if not isinstance(draw_method, _ShapeDraw):
+        return False
+    x1, y1, x2, y2 = draw_method.extents(ctx)
+    xs, ys = matrix[:2, :2].dot([[x1, x2, x1, x2], [y1, y1, y2, y2]]) + matrix[:2, 2:]
+    return (
+        xs.max() < bounds[0]
+        or ys.max() < bounds[1]
+        or xs.min() > bounds[2]
+        or ys.min() > bounds[3]
+    )
+
+
+class Instances(Element):
+    """An element drawn at many transformations (see ``instances``)."""
+
+    __slots__ = ("element", "matrices", "fills")
+
+    def __init__(self, element, matrices, fills=None):
+        """Initialize."""
+        self.element = element
+        self.matrices = matrices
+        self.fills = fills
+        self.matrix = _IDENTITY
+
+    def _profile_label(self):
+        return f"instances[{self.element._profile_label()}]"
+
+    def _draw(self, surface):
+        ctx = surface.get_new_context()
+        if _profiling.current is not None:
+            _profiling.current.count("contexts")
+        self._render(ctx, self.matrix, _DrawState(ctx, surface))
+
+    def _render(self, ctx, matrix, state):
+        element = self.element
+        matrices = np.matmul(np.matmul(matrix, self.matrices), element.matrix)
+        draw_method = getattr(element, "draw_method", None)
+        cancelled = state.cancelled
+        if not isinstance(draw_method, _ShapeDraw):
+            for m in matrices:
+                if cancelled is not None and cancelled.is_set():
+                    return
+                element._render(ctx, m, state)
+            return
+        # The path of the shape is built once, then appended under each
+        # instance's matrix.
+        path = draw_method.copy_path(ctx, _path_scale(matrices))
+        fills = self.fills or repeat(draw_method.style.fill)
+        for ((xx, xy, x0), (yx, yy, y0), _), fill in zip(matrices.tolist(), fills):
+            if cancelled is not None and cancelled.is_set():
+                return
+            ctx.set_matrix(cairo.Matrix(xx, yx, xy, yy, x0, y0))
+            ctx.new_path()
+            ctx.append_path(path)
+            draw_method.paint(ctx, state, fill)
+
+
+def instances(element, matrices=None, xy=None, angle=None, scale=None, fills=None):
+    """Return an Element which draws `element` at many transformations, e.g.
+    a marker at all the points of a scatter plot.
+
+    This is much faster than drawing transformed copies of the element: the
+    path of a shape is built once and replayed under each transformation.
+    Other elements (texts, groups...) are drawn at each transformation
+    without being copied.
+
+    Parameters
+    ------------
+    element
+      The Element to draw (its own transformations are applied first).
+
+    matrices
+      (N,3,3) array of transformation matrices, one per instance.
+
+    xy, angle, scale
+      Instead of `matrices`: (N,2) array of positions, array of N angles,
+      array of N scales (or (N,2) array of (sx, sy) scales). The instances
+      are scaled, then rotated around the origin, then translated, like with
+      the parameters `xy` and `angle` of the shapes.
+
+    fills
+      For shapes only, N sources (e.g. a (N,3) or (N,4) array of colors, or
+      N color strings, see ``gizeh.parse_colors``) replacing the fill of the
+      shape for each instance.
+    """
+    if matrices is None:
+        matrices = transform_matrices(xy=xy, angle=angle, scale=scale)
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 3, 3)
+    if fills is not None:
+        if not isinstance(getattr(element, "draw_method", None), _ShapeDraw):
+            raise ValueError("Only shapes can have a fill per instance.")
+        if len(fills) and isinstance(fills[0], str):
+            fills = parse_colors(fills)
+        if isinstance(fills, np.ndarray):
+            fills = fills.tolist()
+        fills = [_freeze_source(fill) for fill in fills]
+        if len(fills) != len(matrices):
+            raise ValueError(f"Got {len(fills)} fills for {len(matrices)} instances.")
+    return Instances(element, matrices, fills)
 
 
 class ColorGradient:
@@ -286,6 +832,8 @@ class ColorGradient:
             (x1, y1), (x2, y2), (x3, y3) = self.xy1, self.xy2, self.xy3
             pat = cairo.RadialGradient(x1, y1, x2, y2, x3, y3)
         for stop, color in self.stops_colors:
+            if isinstance(color, str):
+                color = parse_color(color)
             if len(color) == 4:
                 pat.add_color_stop_rgba(stop, *color)
             else:
@@ -299,7 +847,9 @@ class ImagePattern(Element):
     Parameters
     ------------
     image
-      A numpy RGB(A) image.
+      A numpy RGB(A) image, a Surface, or a cairo surface (e.g. a view on a
+      rectangle of a larger surface, see ImageAtlas).
+
     pixel_zero
       The coordinates of the pixel of the image that will serve as 0,0 origin
       when filling the element.
@@ -323,9 +873,12 @@ class ImagePattern(Element):
         if pixel_zero is None:
             pixel_zero = [0, 0]
         if isinstance(image, Surface):
+            self._cairo_surface = image._cairo_surface
+        elif isinstance(image, cairo.Surface):
             self._cairo_surface = image
         else:
             self._cairo_surface = Surface.from_image(image)._cairo_surface
+        self._cairo_pattern = None
         self.matrix = translation_matrix(pixel_zero)
         self.filter = filter
         self.extend = extend
@@ -334,9 +887,17 @@ class ImagePattern(Element):
         """Returns a copy of the element, with a new transformation matrix"""
         new = copy(self)
         new.matrix = new_mat
+        new._cairo_pattern = None
         return new
 
     def make_cairo_pattern(self):
+        """Return the cairo pattern, which is created once and reused by all
+        the shapes filled with this ImagePattern."""
+        if self._cairo_pattern is None:
+            self._cairo_pattern = self._new_cairo_pattern()
+        return self._cairo_pattern
+
+    def _new_cairo_pattern(self):
         pat = cairo.SurfacePattern(self._cairo_surface)
         pat.set_filter(
             {
@@ -363,8 +924,14 @@ class ImagePattern(Element):
         return pat
 
 
-for meth in ["scale", "rotate", "translate", "_cairo_matrix"]:
-    exec(f"ImagePattern.{meth} = Element.{meth}")
+# Shared (read-only) matrix of the elements which have not been transformed.
+_IDENTITY = np.eye(3)
+_IDENTITY.flags.writeable = False
+
+
+def _cairo_matrix(m):
+    """Convert a 3x3 numpy transformation matrix to a cairo.Matrix"""
+    return cairo.Matrix(m[0, 0], m[1, 0], m[0, 1], m[1, 1], m[0, 2], m[1, 2])
 
 
 def _set_source(ctx, src):
@@ -375,20 +942,349 @@ def _set_source(ctx, src):
     details.
 
     """
+    if isinstance(src, str):
+        src = parse_color(src)
     if isinstance(src, ColorGradient):
         src.set_source(ctx)
     elif isinstance(src, ImagePattern):
         ctx.set_source(src.make_cairo_pattern())
+    elif isinstance(src, Surface):
+        ctx.set_source_surface(src._cairo_surface, 0, 0)
     elif isinstance(src, np.ndarray) and len(src.shape) > 1:
-        string = src.to_string()
-        surface = cairo.ImageSurface.create_for_data(string)
-        ctx.set_source_surface(surface, 0, 0)
+        ctx.set_source_surface(_image_source(src), 0, 0)
     elif len(src) == 4:  # RGBA
         ctx.set_source_rgba(*src)
     else:  # RGB
         ctx.set_source_rgb(*src)
 
 
+IMAGE_CACHE_SIZE = 32
+
+# {(id, data address, shape, strides): (version, cairo surface)}, in LRU order.
+_image_sources = OrderedDict()
+
+# {id(image): weakref.finalize} of the live images which got an entry, so
+# that each image gets a single finalizer, whatever the evictions.
+_image_finalizers = {}
+
+
+def _forget_image(image_id):
+    """Remove the entries of a garbage-collected image."""
+    _image_finalizers.pop(image_id, None)
+    for key in [key for key in _image_sources if key[0] == image_id]:
+        del _image_sources[key]
+
+
+def _image_version(image):
+    """Return a checksum of the data of writeable images, which may have
+    been modified since their conversion, and None for read-only images."""
+    if not image.flags.writeable:
+        return None
+    return zlib.crc32(np.ascontiguousarray(image))
+
+
+def _image_source(image):
+    """Return the cairo surface of a numpy image used as a source.
+
+    The conversions are cached, so the shapes filled with a same image only
+    convert it once. An entry is forgotten when its image is garbage
+    collected, or when more than IMAGE_CACHE_SIZE images are in use.
+
+    Writeable images are checksummed to detect their modifications since
+    their conversion. This is done once per drawing pass (see
+    _DrawState.image_source): the shapes of a Group share a check, while
+    shapes drawn one by one check the image each time. Making an image
+    read-only (``image.flags.writeable = False``) skips the check.
+    """
+    interface = image.__array_interface__
+    key = (id(image), interface["data"][0], image.shape, image.strides)
+    version = _image_version(image)
+    entry = _image_sources.get(key)
+    if entry is not None and entry[0] == version:
+        _image_sources.move_to_end(key)
+        return entry[1]
+    if id(image) not in _image_finalizers:
+        finalizer = weakref.finalize(image, _forget_image, id(image))
+        _image_finalizers[id(image)] = finalizer
+    _image_sources[key] = version, Surface.from_image(image)._cairo_surface
+    if len(_image_sources) > IMAGE_CACHE_SIZE:
+        _image_sources.popitem(last=False)
+    return _image_sources[key][1]
+
+
+class _Style:
+    """The fill and stroke parameters of a shape (see shape_element).
+
+    Styles are immutable and interned: all shapes with the same parameters
+    share a same _Style (see _get_style).
+    """
+
+    __slots__ = (
+        "fill",
+        "stroke",
+        "stroke_width",
+        "line_cap",
+        "line_join",
+        "__weakref__",
+    )
+
+    def __init__(self, fill, stroke, stroke_width, line_cap, line_join):
+        self.fill = fill
+        self.stroke = stroke
+        self.stroke_width = stroke_width
+        self.line_cap = line_cap
+        self.line_join = line_join
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+_styles = weakref.WeakValueDictionary()
+
+
+def _freeze_source(src):
+    """Return colors given as strings, lists or 1D arrays as (hashable)
+    tuples."""
+    if isinstance(src, str):
+        return parse_color(src)
+    if isinstance(src, list) or (isinstance(src, np.ndarray) and src.ndim == 1):
+        return tuple(np.asarray(src, dtype=float).tolist())
+    return src
+
+
+def _get_style(fill, stroke, stroke_width, line_cap, line_join):
+    """Return the interned _Style with the given parameters."""
+    key = (
+        _freeze_source(fill),
+        _freeze_source(stroke),
+        stroke_width,
+        line_cap,
+        line_join,
+    )
+    try:
+        style = _styles.get(key)
+    except TypeError:  # unhashable source, e.g. a numpy image
+        return _Style(*key)
+    if style is None:
+        style = _styles[key] = _Style(*key)
+    return style
+
+
+class _ShapeDraw:
+    """Draw method of the shapes: draws the contour of the shape with
+    `contour(ctx)`, then fills and strokes it according to the _Style."""
+
+    __slots__ = ("contour", "style", "_path", "_extents")
+
+    def __init__(self, contour, style):
+        self.contour = contour
+        self.style = style
+        # Only shapes used as clips or instanced keep their path (see
+        # copy_path). Culled shapes only keep their extents.
+        self._path = None  # (scale, path)
+        self._extents = None
+
+    def copy_path(self, ctx, scale=1.0):
+        """Return the contour of the shape in the shape's coordinates, as
+        returned by cairo's copy_path, for use with ctx.append_path. The path
+        is built once (using `ctx`, whose matrix and path are changed), and
+        again only for larger scales."""
+        if self._path is None or self._path[0] < scale:
+            # Under a scale at least as large as the one the path will be
+            # drawn with, so that arcs and curves are subdivided enough.
+            ctx.set_matrix(cairo.Matrix(scale, 0, 0, scale, 0, 0))
+            ctx.new_path()
+            self.contour(ctx)
+            self._path = (scale, ctx.copy_path())
+        return self._path[1]
+
+    def extents(self, ctx):
+        """Return (x1, y1, x2, y2) bounds of the shape, stroke included, in
+        the shape's coordinates. They are computed once, using `ctx` (whose
+        matrix and path are changed)."""
+        if self._extents is None:
+            ctx.identity_matrix()
+            ctx.new_path()
+            self.contour(ctx)
+            self._extents = ctx.path_extents()
+        x1, y1, x2, y2 = self._extents
+        # Miter joins can extend up to 5 widths (cairo's miter limit is 10).
+        margin = 5 * self.style.stroke_width
+        return (x1 - margin, y1 - margin, x2 + margin, y2 + margin)
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __call__(self, ctx):
+        # Elements are drawn on new contexts, in the default state.
+        self.render(ctx, _DrawState(ctx))
+
+    def render(self, ctx, state):
+        """Draw the shape, changing the context's state through `state`."""
+        self.contour(ctx)
+        self.paint(ctx, state, self.style.fill)
+
+    def paint(self, ctx, state, fill):
+        """Fill the current path with `fill`, and stroke it."""
+        style = self.style
+        if fill is not None:
+            state.set_source(fill)
+            ctx.fill_preserve()
+        if style.stroke_width > 0:
+            state.set_line_style(style.stroke_width, style.line_cap, style.line_join)
+            state.set_source(style.stroke)
+            ctx.stroke_preserve()
+
+
+_DEFAULT_SOURCE = (0.0, 0.0, 0.0, 1.0)
+_DEFAULT_LINE_WIDTH = 2.0
+
+# Settings of the renders running in the current thread. gizeh.aio sets
+# `cancelled` to a threading.Event, checked between the elements of groups
+# and instances so that cancelled renders stop early.
+_thread_state = threading.local()
+
+
+class _DrawState:
+    """Keeps track of the source and line style of a cairo context on which
+    many elements are drawn, to skip the changes which would be redundant.
+
+    Only solid colors are tracked as sources: gradients and image patterns
+    depend on the transformation matrix active when they are set.
+    """
+
+    __slots__ = (
+        "ctx",
+        "surface",
+        "source",
+        "line_width",
+        "line_cap",
+        "line_join",
+        "bounds",
+        "cancelled",
+        "images",
+    )
+
+    def __init__(self, ctx, surface=None):
+        # Initial values are the ones of a new cairo context.
+        self.ctx = ctx
+        self.surface = surface
+        self.source = _DEFAULT_SOURCE
+        self.line_width = _DEFAULT_LINE_WIDTH
+        if not _LINE_CAPS:
+            # The context may come from a surface made without gizeh.
+            _load_cairo()
+        self.line_cap = _LINE_CAPS[None]
+        self.line_join = _LINE_JOINS[None]
+        # (x1, y1, x2, y2) outside of which shapes are not drawn, or None.
+        self.bounds = None
+        # threading.Event stopping the drawing once set, or None.
+        self.cancelled = getattr(_thread_state, "cancelled", None)
+        # {id(image): (image, cairo surface)} of the numpy images used as
+        # sources during this drawing pass, shared by the copies of the state.
+        self.images = {}
+
+    def copy(self):
+        new = _DrawState.__new__(_DrawState)
+        for name in _DrawState.__slots__:
+            setattr(new, name, getattr(self, name))
+        return new
+
+    def set_source(self, src):
+        if type(src) is tuple:
+            color = src if len(src) == 4 else src + (1.0,)
+            if color == self.source:
+                return
+            self.source = color
+        else:
+            self.source = None
+            if isinstance(src, np.ndarray) and src.ndim > 1:
+                self.ctx.set_source_surface(self.image_source(src), 0, 0)
+                return
+        _set_source(self.ctx, src)
+
+    def image_source(self, image):
+        """Return the cairo surface of a numpy image (see _image_source).
+        Images can't change during a drawing pass, so each image is looked up
+        (and checksummed) only once per pass."""
+        entry = self.images.get(id(image))
+        if entry is None:
+            # The image is kept referenced, so its id isn't reused.
+            entry = self.images[id(image)] = (image, _image_source(image))
+        return entry[1]
+
+    def set_line_style(self, width, line_cap, line_join):
+        ctx = self.ctx
+        if width != self.line_width:
+            ctx.set_line_width(width)
+            self.line_width = width
+        line_cap, line_join = _LINE_CAPS[line_cap], _LINE_JOINS[line_join]
+        if line_cap != self.line_cap:
+            ctx.set_line_cap(line_cap)
+            self.line_cap = line_cap
+        if line_join != self.line_join:
+            ctx.set_line_join(line_join)
+            self.line_join = line_join
+
+    def reset(self):
+        """Give the context its default source and line style back, without
+        updating the tracked state (use between ctx.save and ctx.restore)."""
+        ctx = self.ctx
+        if self.source != _DEFAULT_SOURCE:
+            ctx.set_source_rgb(0, 0, 0)
+        if self.line_width != _DEFAULT_LINE_WIDTH:
+            ctx.set_line_width(_DEFAULT_LINE_WIDTH)
+        if self.line_cap != _LINE_CAPS[None]:
+            ctx.set_line_cap(_LINE_CAPS[None])
+        if self.line_join != _LINE_JOINS[None]:
+            ctx.set_line_join(_LINE_JOINS[None])
+
+
+class _SharedContextSurface:
+    """Stands for the surface of a Group for the elements with a custom
+    ``draw``: get_new_context returns the Group's context, in the state it
+    had when the element's drawing started (see Element._render). Other
+    attributes are the ones of the surface."""
+
+    def __init__(self, ctx, surface):
+        self._ctx = ctx
+        self._surface = surface
+
+    def get_new_context(self):
+        ctx = self._ctx
+        ctx.restore()  # undo the changes made since the last call
+        ctx.save()
+        ctx.new_path()
+        return ctx
+
+    def __getattr__(self, name):
+        return getattr(self._surface, name)
+
+
+def _sort_by_style(elements):
+    """Reorder the elements so that consecutive shapes with the same style
+    are drawn one after the other. Other elements (text, groups...) stay in
+    place and shapes are not moved across them."""
+    result, run, order = [], [], {}
+
+    def flush_run():
+        run.sort(key=lambda e: order[e.draw_method.style])
+        result.extend(run)
+        run.clear()
+        order.clear()
+
+    for e in elements:
+        draw_method = getattr(e, "draw_method", None)
+        if isinstance(draw_method, _ShapeDraw):
+            order.setdefault(draw_method.style, len(order))
+            run.append(e)
+        else:
+            flush_run()
+            result.append(e)
+    flush_run()
+    return result
+
+
 #########################################################################
 # BASE ELEMENTS
 
@@ -425,9 +1321,12 @@ def shape_element(
       - A (r,g,b) color tuple, where 0 =< r,g,b =< 1
       - A (r,g,b, a) color tuple, where 0=< r,g,b,a =< 1 (a defines the
         transparency: 0 is transparent, 1 is opaque)
+      - A color string, e.g. "#ff8000", "rgba(255, 128, 0, 0.5)" or "navy"
+        (see gizeh.parse_color)
       - A gizeh.ColorGradient object.
       - A gizeh.Surface
-      - A numpy image (not implemented yet)
+      - A numpy image (see Surface.from_image), whose top-left corner is
+        placed at point (0,0) of the shape, i.e. its `xy`.
 
     stroke
       Decides how the stroke (contour) of the element will be filled.
@@ -444,46 +1343,54 @@ def shape_element(
 
     """
 
-    def new_draw(ctx):
-        draw_contour(ctx)
-        if fill is not None:
-            ctx.move_to(*xy)
-            _set_source(ctx, fill)
-            ctx.fill_preserve()
-        if stroke_width > 0:
-            ctx.move_to(*xy)
-            ctx.set_line_width(stroke_width)
-            if line_cap is not None:
-                ctx.set_line_cap(
-                    {
-                        "butt": cairo.LINE_CAP_BUTT,
-                        "round": cairo.LINE_CAP_ROUND,
-                        "square": cairo.LINE_CAP_SQUARE,
-                    }[line_cap]
-                )
-            if line_join is not None:
-                ctx.set_line_join(
-                    {
-                        "cut": cairo.LINE_JOIN_BEVEL,
-                        "square": cairo.LINE_JOIN_MITER,
-                        "round": cairo.LINE_JOIN_ROUND,
-                    }[line_join]
-                )
-            _set_source(ctx, stroke)
-            ctx.stroke_preserve()
+    style = _get_style(fill, stroke, stroke_width, line_cap, line_join)
+    new_draw = _ShapeDraw(draw_contour, style)
 
+    # e.g. "polyline" for the draw function defined in polyline()
+    kind = (
+        getattr(draw_contour, "kind", None)
+        or getattr(draw_contour, "__qualname__", "shape").split(".")[0]
+    )
+    element = Element(new_draw, kind=kind)
     if (angle == 0) and (tuple(xy) == (0, 0)):
-        return Element(new_draw)
+        return element
     elif angle == 0:
-        return Element(new_draw).translate(xy)
+        return element.translate(xy)
     elif tuple(xy) == (0, 0):
-        return Element(new_draw).rotate(angle)
+        return element.rotate(angle)
     else:
-        return Element(new_draw).rotate(angle).translate(xy)
+        return element.rotate(angle).translate(xy)
+
+
+class _RectangleContour:
+    """Contour of a rectangle (a lighter alternative to a closure)."""
+
+    __slots__ = ("lx", "ly")
+    kind = "rectangle"
+
+    def __init__(self, lx, ly):
+        self.lx, self.ly = lx, ly
+
+    def __call__(self, ctx):
+        lx, ly = self.lx, self.ly
+        ctx.rectangle(-lx / 2, -ly / 2, lx, ly)
+
+
+class _ArcContour:
+    """Contour of an arc (a lighter alternative to a closure)."""
+
+    __slots__ = ("r", "a1", "a2")
+    kind = "arc"
+
+    def __init__(self, r, a1, a2):
+        self.r, self.a1, self.a2 = r, a1, a2
+
+    def __call__(self, ctx):
+        ctx.arc(0, 0, self.r, self.a1, self.a2)
 
 
 def rectangle(lx, ly, **kw):
-    return shape_element(lambda c: c.rectangle(-lx / 2, -ly / 2, lx, ly), **kw)
+    return shape_element(_RectangleContour(lx, ly), **kw)
 
 
 def square(l, **kw):  # noqa: E741
@@ -491,7 +1398,7 @@ def square(l, **kw):  # noqa: E741
 
 
 def arc(r, a1, a2, **kw):
-    return shape_element(lambda c: c.arc(0, 0, r, a1, a2), **kw)
+    return shape_element(_ArcContour(r, a1, a2), **kw)
 
 
 def circle(r, **kw):
@@ -510,8 +1417,7 @@ def polyline(points, close_path=False, **kw):
 
 
 def regular_polygon(r, n, **kw):
-    points = [polar2cart(r, a) for a in np.linspace(0, 2 * np.pi, n + 1)[:-1]]
-    return polyline(points, close_path=True, **kw)
+    return polyline(regular_polygon_points(r, n), close_path=True, **kw)
 
 
 def bezier_curve(points, **kw):
@@ -536,31 +1442,12 @@ def ellipse(w, h, **kw):
       of the ellipse.
     """
 
-    # Bezier control points for a quarter of an ellipse.
-    ctrl_pnts = [
-        ((w / 2), 0),
-        ((w / 2), (h / 2) * (4 / 3) * (sqrt(2) - 1)),
-        ((w / 2) * (4 / 3) * (sqrt(2) - 1), (h / 2)),
-        (0, (h / 2)),
-    ]
-
-    # Create a list, all_points, which will be populated with lists of control
-    # points for 4 Bezier curves that will approximate the ellipse.
-    all_points = []
-    for i in [1, -1]:
-        for j in [1, -1]:
-            all_points.append([(pnt[0] * i, pnt[1] * (-j)) for pnt in ctrl_pnts])
-    # Permutes the last three lists to put the curves in correct order
-    all_points.append(all_points.pop(1))
-    # Correct the order of the two sublists defining their respective quarter
-    # pieces of the ellipse so that the whole ellipse is drawn in order
-    all_points[1].reverse()
-    all_points[3].reverse()
+    start, curves = ellipse_curves(w, h)
 
     def draw(ctx):
-        ctx.move_to(*ctrl_pnts[0])
-        for points in all_points:
-            ctx.curve_to(*tuple(chain(*points))[2:])
+        ctx.move_to(*start)
+        for curve in curves:
+            ctx.curve_to(*curve)
         ctx.close_path()
 
     return shape_element(draw, **kw)
@@ -571,9 +1458,7 @@ def star(nbranches=5, radius=1.0, ratio=0.5, **kwargs):
     radius, and ratio between branches and body. It accepts the usual
     parameters xy, angle, fill, etc."""
 
-    rr = radius * np.array(nbranches * [1.0, ratio])
-    aa = np.linspace(0, 2 * np.pi, 2 * nbranches + 1)[:-1]
-    points = polar2cart(rr, aa)
+    points = star_points(nbranches, radius, ratio)
     return polyline(points, close_path=True, **kwargs)
 
 
@@ -618,20 +1503,23 @@ def text(
       see the doc for ``shape_element``
     """
 
-    fontweight = {"normal": cairo.FONT_WEIGHT_NORMAL, "bold": cairo.FONT_WEIGHT_BOLD}[
+    # Names of cairo's constants, which are resolved when drawing.
+    fontweight = {"normal": "FONT_WEIGHT_NORMAL", "bold": "FONT_WEIGHT_BOLD"}[
         fontweight
     ]
     fontslant = {
-        "normal": cairo.FONT_SLANT_NORMAL,
-        "oblique": cairo.FONT_SLANT_OBLIQUE,
-        "italic": cairo.FONT_SLANT_ITALIC,
+        "normal": "FONT_SLANT_NORMAL",
+        "oblique": "FONT_SLANT_OBLIQUE",
+        "italic": "FONT_SLANT_ITALIC",
     }[fontslant]
 
     def draw(ctx):
         nonlocal xy
         if xy is None:
             xy = [0, 0]
-        ctx.select_font_face(fontfamily, fontslant, fontweight)
+        ctx.select_font_face(
+            fontfamily, getattr(cairo, fontslant), getattr(cairo, fontweight)
+        )
         ctx.set_font_size(fontsize)
         xbear, ybear, w, h, xadvance, yadvance = ctx.text_extents(txt)
         xshift = {"left": 0, "center": -w / 2, "right": -w}[h_align] - xbear
@@ -648,4 +1536,8 @@ def text(
             ctx.set_line_width(stroke_width)
             ctx.stroke()
 
-    return Element(draw).scale(1, 1 if (y_origin == "top") else -1).rotate(angle)
+    return (
+        Element(draw, kind="text")
+        .scale(1, 1 if (y_origin == "top") else -1)
+        .rotate(angle)
+    )
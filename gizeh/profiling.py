@@ -0,0 +1,113 @@
+"""Opt-in profiling of the drawing of Elements and Groups.
+
+Usage::
+
+    with gizeh.profile() as profiler:
+        scene.draw(surface)
+        surface.get_npimage()
+    print(profiler.report())
+    profiler.write_folded("frame.folded")  # for flamegraph.pl, speedscope...
+
+When no profiler is active, the drawing code only checks that ``current``
+is None. Profilers are not thread-safe: profile one thread at a time.
+"""
+
+import time
+from collections import defaultdict
+
+# The active profiler, or None. Checked by the drawing code of gizeh.
+current = None
+
+COUNTERS = ("contexts", "copies", "bytes")
+
+
+class Profiler:
+    """Records the time spent drawing each Element and Group.
+
+    Statistics are aggregated per element type (e.g. "rectangle", "text") and
+    per named group (``Group(..., name="background")``):
+
+    stats
+      Dict ``{label: {"calls", "time", "self_time", "contexts", "copies",
+      "bytes"}}`` where times are in seconds, "time" includes the time spent
+      in sub-elements and "self_time" doesn't. "contexts" is the number of
+      cairo contexts created, "copies" the number of Elements copied, and
+      "bytes" the quantity of pixel data moved.
+
+    stacks
+      Dict ``{(label_1, label_2, ...): self_time}``, i.e. the time spent in
+      each stack of nested elements (see ``to_folded``).
+    """
+
+    def __init__(self):
+        self.stats = defaultdict(
+            lambda: dict(calls=0, time=0.0, self_time=0.0, **dict.fromkeys(COUNTERS, 0))
+        )
+        self.stacks = defaultdict(float)
+        self._frames = []  # [label, start time, time spent in children]
+        self._previous = None
+
+    def __enter__(self):
+        global current
+        self._previous, current = current, self
+        return self
+
+    def __exit__(self, *exc_info):
+        global current
+        current = self._previous
+
+    def enter(self, element):
+        """Start timing the drawing of an element."""
+        self._frames.append([element._profile_label(), time.perf_counter(), 0.0])
+
+    def exit(self):
+        """Stop timing the innermost element being drawn."""
+        label, start, children_time = self._frames[-1]
+        duration = time.perf_counter() - start
+        stack = tuple(f[0] for f in self._frames)
+        self._frames.pop()
+        if self._frames:
+            self._frames[-1][2] += duration
+        stats = self.stats[label]
+        stats["calls"] += 1
+        stats["time"] += duration
+        stats["self_time"] += duration - children_time
+        self.stacks[stack] += duration - children_time
+
+    def count(self, counter, n=1):
+        """Add `n` to a counter of the element being drawn."""
+        label = self._frames[-1][0] if self._frames else "(no element)"
+        self.stats[label][counter] += n
+
+    def report(self, sort_by="self_time"):
+        """Return a table of the statistics, as a string."""
+        columns = ["calls", "time", "self_time", *COUNTERS]
+        lines = [f"{'element':<30}" + "".join(f"{c:>12}" for c in columns)]
+        rows = sorted(self.stats.items(), key=lambda kv: -kv[1][sort_by])
+        for label, stats in rows:
+            cells = [
+                f"{1000 * stats[c]:10.2f}ms" if "time" in c else f"{stats[c]:12d}"
+                for c in columns
+            ]
+            lines.append(f"{label:<30}" + "".join(cells))
+        return "\n".join(lines)
+
+    def to_folded(self):
+        """Return the profile in the "folded stacks" format (one line
+        ``group;sub_group;element microseconds`` per stack) which can be read
+        by flame graph tools such as flamegraph.pl or speedscope.
+        """
+        return "\n".join(
+            f"{';'.join(stack)} {int(round(1e6 * duration))}"
+            for stack, duration in self.stacks.items()
+        )
+
+    def write_folded(self, filename):
+        """Write the profile in the "folded stacks" format (see to_folded)."""
+        with open(filename, "w") as f:
+            f.write(self.to_folded() + "\n")
+
+
+def profile():
+    """Return a new Profiler, to be used as a context manager."""
+    return Profiler()
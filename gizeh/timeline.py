@@ -0,0 +1,184 @@
+"""Animations made of layers, with caching of the layers which don't change.
+
+A Timeline is a stack of Layers. Each layer gives the Element to draw at time
+`t` and declares how it depends on time:
+
+- "static": the layer never changes (e.g. a background).
+- "piecewise": the layer changes only at some times, given either as a list
+  of `breakpoints` or by a `key` function returning a same (hashable) value
+  for all times at which the layer looks the same (e.g. a slide title).
+- "continuous": the layer changes at every frame.
+
+Consecutive static and piecewise layers are rasterized together and cached,
+so a frame only re-renders the continuous layers and the layers whose key
+changed, then composites the cached rasters::
+
+    timeline = Timeline(
+        [
+            Layer(background),  # an Element: static
+            Layer(make_title, "piecewise", breakpoints=[2, 5]),
+            Layer(make_ball),  # a function of t: continuous
+        ],
+        width=640,
+        height=480,
+        bg_color=(1, 1, 1),
+    )
+    clip = moviepy.VideoClip(timeline.make_frame, duration=6)
+
+Because cached layers are composited as 8-bit rasters, antialiased edges may
+differ very slightly (1/255) from a frame where all layers are drawn directly.
+"""
+
+from bisect import bisect_right
+from collections import OrderedDict
+
+from .gizeh import Element, Group, Surface
+
+TIMINGS = ("static", "piecewise", "continuous")
+
+
+class Layer:
+    """A layer of a Timeline.
+
+    Parameters
+    ------------
+    make_element
+      Function ``t -> Element`` returning the element of the layer at time t
+      (or a list of Elements, drawn as a Group), or an Element (for static
+      layers).
+
+    timing
+      "static", "piecewise" or "continuous". Default is "piecewise" if
+      `breakpoints` or `key` is provided, "static" if `make_element` is an
+      Element, else "continuous".
+
+    breakpoints
+      For piecewise layers: sorted list of the times at which the layer
+      changes.
+
+    key
+      For piecewise layers, instead of breakpoints: function ``t -> key``
+      returning a same hashable key for all the times when the layer is the
+      same.
+    """
+
+    def __init__(self, make_element, timing=None, breakpoints=None, key=None):
+        is_piecewise = (breakpoints is not None) or (key is not None)
+        if timing is None and is_piecewise:
+            timing = "piecewise"
+        if isinstance(make_element, Element):
+            element = make_element
+            make_element = lambda t: element  # noqa: E731
+            timing = timing or "static"
+        if timing is None:
+            timing = "continuous"
+        if timing not in TIMINGS:
+            raise ValueError(f"timing should be one of {TIMINGS}, not {timing!r}")
+        if timing == "piecewise":
+            if (breakpoints is None) == (key is None):
+                raise ValueError("Piecewise layers need either breakpoints or a key.")
+            if breakpoints is not None:
+                breakpoints = sorted(breakpoints)
+                key = lambda t: bisect_right(breakpoints, t)  # noqa: E731
+        elif is_piecewise:
+            raise ValueError(
+                f"Breakpoints and keys are for piecewise layers, not {timing} ones."
+            )
+        self.make_element = make_element
+        self.timing = timing
+        self.key = key
+
+    def element_at(self, t):
+        """Return the Element of the layer at time t."""
+        element = self.make_element(t)
+        if isinstance(element, list):
+            element = Group(element)
+        return element
+
+    def key_at(self, t):
+        """Return a key which is the same at all times when the layer looks
+        the same. Only meaningful for static and piecewise layers."""
+        return self.key(t) if self.timing == "piecewise" else None
+
+
+class Timeline:
+    """A stack of Layers (the first one being at the bottom) which renders
+    frames with caching of the layers which do not change.
+
+    Parameters
+    ------------
+    layers
+      List of Layers.
+
+    width, height, bg_color, scale
+      Parameters of the Surfaces of the frames (see Surface).
+
+    cache_size
+      Maximal number of versions of each group of cached layers kept in
+      memory (e.g. to go back and forth between the slides of piecewise
+      layers). Each version is one transparent raster of the frame size.
+    """
+
+    def __init__(self, layers, width, height, bg_color=None, scale=1.0, cache_size=8):
+        self.layers = layers
+        self.width = width
+        self.height = height
+        self.bg_color = bg_color
+        self.scale = scale
+        self.cache_size = cache_size
+        # Consecutive cacheable layers are grouped into "runs" which are
+        # rasterized together. Continuous layers are runs of their own.
+        self._runs = []
+        for layer in layers:
+            cacheable = layer.timing != "continuous"
+            if cacheable and self._runs and self._runs[-1][0]:
+                self._runs[-1][1].append(layer)
+            else:
+                self._runs.append((cacheable, [layer]))
+        self._caches = [OrderedDict() for _ in self._runs]
+
+    def element_at(self, t):
+        """Return a Group of all the layers' elements at time t (without any
+        caching), e.g. to draw the frame on a PDFSurface."""
+        return Group([layer.element_at(t) for layer in self.layers])
+
+    def _new_surface(self, bg_color=None):
+        return Surface(self.width, self.height, bg_color=bg_color, scale=self.scale)
+
+    def _cached_raster(self, run_index, t):
+        """Return a raster of the given run of cacheable layers at time t."""
+        layers = self._runs[run_index][1]
+        cache = self._caches[run_index]
+        key = tuple(layer.key_at(t) for layer in layers)
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        raster = self._new_surface()
+        for layer in layers:
+            layer.element_at(t).draw(raster)
+        cache[key] = raster
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return raster
+
+    def render(self, t):
+        """Return a Surface with the frame at time t."""
+        surface = self._new_surface(bg_color=self.bg_color)
+        for i, (cacheable, layers) in enumerate(self._runs):
+            if cacheable:
+                ctx = surface.get_new_context()
+                ctx.set_source_surface(self._cached_raster(i, t)._cairo_surface)
+                ctx.paint()
+            else:
+                layers[0].element_at(t).draw(surface)
+        return surface
+
+    def make_frame(self, t):
+        """Return the frame at time t as a numpy RGB image (for instance for
+        MoviePy's ``VideoClip(timeline.make_frame, duration=...)``)."""
+        return self.render(t).get_npimage()
+
+    def clear_cache(self):
+        """Forget all the cached layer rasters."""
+        for cache in self._caches:
+            cache.clear()
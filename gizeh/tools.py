@@ -1,5 +1,159 @@
+from functools import lru_cache
+
+import numpy as np
+
+# CSS's basic color keywords.
+CSS_COLORS = {
+    "black": "#000000",
+    "silver": "#c0c0c0",
+    "gray": "#808080",
+    "grey": "#808080",
+    "white": "#ffffff",
+    "maroon": "#800000",
+    "red": "#ff0000",
+    "purple": "#800080",
+    "fuchsia": "#ff00ff",
+    "magenta": "#ff00ff",
+    "green": "#008000",
+    "lime": "#00ff00",
+    "olive": "#808000",
+    "yellow": "#ffff00",
+    "navy": "#000080",
+    "blue": "#0000ff",
+    "teal": "#008080",
+    "aqua": "#00ffff",
+    "cyan": "#00ffff",
+    "orange": "#ffa500",
+    "transparent": "#00000000",
+}
+
+
 def htmlcolor_to_rgb(string):
+    """Convert a '#RRGGBB' color to a [r, g, b] list of values in [0, 1]."""
     if not (string.startswith("#") and len(string) == 7):
         raise ValueError("Bad html color format. Expected: '#RRGGBB' ")
 
-    return [1.0 * int(n, 16) / 255 for n in (string[:2], string[2:4], string[4:])]
+    return [1.0 * int(n, 16) / 255 for n in (string[1:3], string[3:5], string[5:])]
+
+
+def _parse_css_function(arguments):
+    """Parse the arguments of rgb(...) or rgba(...) colors."""
+    parts = [part.strip() for part in arguments.split(",")]
+    if len(parts) not in (3, 4):
+        raise ValueError
+    rgb = [
+        float(part[:-1]) / 100 if part.endswith("%") else float(part) / 255
+        for part in parts[:3]
+    ]
+    return tuple(rgb + [float(part) for part in parts[3:]])
+
+
+@lru_cache(maxsize=4096)
+def parse_color(color):
+    """Convert a color string to a (r, g, b) or (r, g, b, a) tuple of values
+    in [0, 1], usable as a fill or stroke.
+
+    Accepted formats are hexadecimal ("#RGB", "#RGBA", "#RRGGBB",
+    "#RRGGBBAA"), CSS functions ("rgb(255, 0, 0)", "rgba(255, 0, 0, 0.5)",
+    "rgb(100%, 0%, 0%)") and CSS's basic color keywords ("red", "navy"...).
+    Results are cached, so parsing a same string again is a dict lookup.
+    """
+    string = color.strip().lower()
+    string = CSS_COLORS.get(string, string)
+    try:
+        if string.startswith("#"):
+            digits = string[1:]
+            if len(digits) in (3, 4):
+                digits = "".join(2 * digit for digit in digits)
+            if len(digits) in (6, 8):
+                return tuple(
+                    int(digits[i : i + 2], 16) / 255 for i in range(0, len(digits), 2)
+                )
+        elif string.endswith(")"):
+            function, _, arguments = string[:-1].partition("(")
+            if function.strip() in ("rgb", "rgba"):
+                return _parse_css_function(arguments)
+    except ValueError:
+        pass
+    raise ValueError(f"Unknown color format: {color!r}")
+
+
+def parse_colors(colors):
+    """Convert an array (or list) of color strings (see parse_color) to an
+    array of floats with one more dimension, e.g. N strings give a (N,3)
+    array, or a (N,4) array if some colors have an alpha (the others then
+    get an alpha of 1).
+
+    Each distinct string is parsed only once, which makes this fast for data
+    mapping many values to a few categorical colors. The result can be used
+    as the `fills` of ``gizeh.instances``.
+    """
+    colors = np.asarray(colors)
+    if colors.size == 0:
+        return np.zeros(colors.shape + (3,))
+    unique, inverse = np.unique(colors, return_inverse=True)
+    parsed = [parse_color(str(color)) for color in unique]
+    table = np.ones((len(parsed), max(len(color) for color in parsed)))
+    for i, color in enumerate(parsed):
+        table[i, : len(color)] = color
+    return table[inverse.reshape(colors.shape)]
+
+
+_alpha_tables = {}
+
+
+def _alpha_table(kind):
+    """Return a (256*256,) uint8 lookup table where entry ``256*a + c`` is
+    color value c premultiplied by alpha a ("premultiply"), or divided by
+    alpha a ("unpremultiply"), with rounding to the nearest integer."""
+    if kind not in _alpha_tables:
+        a, c = np.mgrid[:256, :256].astype(np.int64)
+        if kind == "premultiply":
+            table = (c * a + 127) // 255
+        else:
+            table = np.minimum(255, (c * 255 + a // 2) // np.maximum(a, 1))
+            table[0] = 0
+        _alpha_tables[kind] = table.astype(np.uint8).ravel()
+    return _alpha_tables[kind]
+
+
+def _convert_alpha(image, kind, out, min_alpha):
+    if out is None:
+        out = image.copy()
+    elif out is not image:
+        out[...] = image
+    if not out.flags.c_contiguous:
+        raise ValueError("The output image must be C-contiguous.")
+    pixels = out.reshape(-1, 4)
+    alpha = pixels[:, 3]
+    # Only the pixels with min_alpha <= alpha < 255 need to be converted.
+    indices = np.flatnonzero((alpha - np.uint8(min_alpha)) < 255 - min_alpha)
+    if len(indices):
+        table = _alpha_table(kind)
+        offsets = alpha[indices].astype(np.uint16)[:, None] << 8
+        pixels[indices, :3] = table[offsets | pixels[indices, :3]]
+    return out
+
+
+def premultiply_alpha(image, out=None):
+    """Convert a (H,W,4) uint8 image with straight alpha (the alpha channel
+    being the last one) to premultiplied alpha, i.e. multiply the color
+    channels by alpha/255.
+
+    The result is written in `out` if provided (which can be the input image,
+    for an in-place conversion), else in a new array. Integer lookup tables
+    are used and only semi-transparent and transparent pixels are converted.
+    """
+    return _convert_alpha(image, "premultiply", out, min_alpha=0)
+
+
+def unpremultiply_alpha(image, out=None):
+    """Convert a (H,W,4) uint8 image with premultiplied alpha (such as
+    Cairo's image data) to straight alpha, i.e. divide the color channels by
+    alpha/255.
+
+    The result is written in `out` if provided (which can be the input image,
+    for an in-place conversion), else in a new array. Integer lookup tables
+    are used and only semi-transparent pixels are converted.
+    """
+    return _convert_alpha(image, "unpremultiply", out, min_alpha=1)
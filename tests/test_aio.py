@@ -0,0 +1,57 @@
+import asyncio
+import time
+
+import pytest
+
+import gizeh as gz
+
+
+def _scene(i):
+    return [gz.circle(10 + i, xy=(50, 50), fill=(1, 0, 0)), gz.square(5, xy=(5, 5))]
+
+
+def test_render_async():
+    renderer = gz.AsyncRenderer(max_workers=2, max_concurrency=2)
+
+    async def handle_request(i):
+        surface = gz.Surface(100, 100, bg_color=(1, 1, 1))
+        await surface.render_async(_scene(i), renderer=renderer)
+        png = await surface.to_png_bytes_async(renderer=renderer)
+        return surface, png
+
+    async def main():
+        return await asyncio.gather(*[handle_request(i) for i in range(8)])
+
+    results = asyncio.run(main())
+    renderer.shutdown()
+    for i, (surface, png) in enumerate(results):
+        expected = gz.Surface(100, 100, bg_color=(1, 1, 1)).render(_scene(i))
+        assert (surface.get_npimage() == expected.get_npimage()).all()
+        assert png.startswith(b"\x89PNG")
+
+
+def test_render_async_cancellation():
+    renderer = gz.AsyncRenderer(max_workers=2, max_concurrency=1)
+    drawn = []
+
+    def slow_draw(ctx):
+        drawn.append(len(drawn))
+        time.sleep(0.001)
+
+    group = gz.Group([gz.Element(slow_draw) for _ in range(2000)])
+
+    async def main():
+        surface = gz.Surface(100, 100)
+        task = asyncio.ensure_future(surface.render_async(group, renderer=renderer))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        # The slot of the cancelled render is kept until its thread stops
+        # drawing: the next render only starts after that.
+        return await renderer.run(len, drawn)
+
+    n_drawn = asyncio.run(main())
+    renderer.shutdown()
+    assert 0 < n_drawn < len(group.elements)
+    assert len(drawn) == n_drawn
@@ -0,0 +1,42 @@
+import numpy as np
+
+import gizeh as gz
+from gizeh.atlas import _shelf_pack
+
+
+def test_shelf_pack():
+    sizes = [(10, 5), (30, 20), (25, 10), (20, 8)]
+    positions, (width, height) = _shelf_pack(sizes, max_width=60, padding=2)
+    assert positions == [(22, 22), (0, 0), (32, 0), (0, 22)]
+    assert (width, height) == (57, 30)
+    boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(positions, sizes)]
+    for i, (x1, y1, x2, y2) in enumerate(boxes):
+        assert x2 <= width and y2 <= height
+        for u1, v1, u2, v2 in boxes[i + 1 :]:
+            assert x2 + 2 <= u1 or u2 + 2 <= x1 or y2 + 2 <= v1 or v2 + 2 <= y1
+
+
+def test_atlas_patterns_match_image_patterns():
+    rng = np.random.RandomState(0)
+    images = {
+        "a": rng.randint(0, 256, (16, 16, 3)).astype(np.uint8),
+        "b": rng.randint(0, 256, (8, 12, 4)).astype(np.uint8),
+        "c": rng.randint(0, 256, (10, 5)).astype(np.uint8),
+    }
+    atlas = gz.ImageAtlas(images, max_width=20, filter="nearest")
+    assert len(atlas) == 3
+    assert atlas.pattern("b", pixel_zero=(6, 4)) is atlas.pattern("b", (6, 4))
+
+    def render(make_pattern):
+        surface = gz.Surface(60, 20)
+        for i, (key, image) in enumerate(images.items()):
+            h, w = image.shape[:2]
+            pattern = make_pattern(key, image, (w / 2, h / 2))
+            gz.square(20, xy=(10 + 20 * i, 10), fill=pattern).draw(surface)
+        return surface.get_npimage(transparent=True)
+
+    with_atlas = render(lambda key, image, center: atlas.pattern(key, center))
+    separate = render(
+        lambda key, image, center: gz.ImagePattern(image, center, filter="nearest")
+    )
+    assert np.array_equal(with_atlas, separate)
@@ -0,0 +1,33 @@
+import json
+import sys
+
+import numpy as np
+import pytest
+
+from gizeh.bench import _peak_rss_increase, find_regressions, run_benchmarks
+from gizeh.bench.__main__ import main
+
+
+def test_run_benchmarks(tmpdir):
+    results = run_benchmarks("png_export", repeat=2)
+    assert list(results["results"]) == ["png_export"]
+    assert results["results"]["png_export"]["min"] > 0
+    json.dumps(results)
+
+    baseline = json.loads(json.dumps(results))
+    assert find_regressions(results, baseline) == []
+    baseline["results"]["png_export"]["min"] /= 2
+    assert [r[0] for r in find_regressions(results, baseline)] == ["png_export"]
+
+    path = str(tmpdir.join("baseline.json"))
+    assert main(["export", "--repeat", "1", "--output", path]) == 0
+    assert (
+        main(["export", "--repeat", "1", "--baseline", path, "--tolerance", "100"]) == 0
+    )
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads /proc")
+def test_peak_rss_includes_native_memory():
+    # numpy's data buffers are allocated outside of Python's allocator, like
+    # cairo's surfaces.
+    assert _peak_rss_increase(lambda: np.ones(10**7).sum()) > 40e6
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from gizeh.bench import (
+    EQUIVALENCES,
+    equivalences,  # noqa: F401  (registers the checks)
+    image_difference,
+    run_equivalences,
+)
+from gizeh.bench.__main__ import main
+
+
+def test_image_difference():
+    reference = np.zeros((10, 10, 3), dtype=np.uint8)
+    image = reference.copy()
+    image[0, 0] = (0, 255, 0)
+    image[1, 1, 2] = 2
+    difference = image_difference(image, reference)
+    assert difference["max"] == 255
+    assert difference["mean"] == pytest.approx(257 / 300)
+    assert difference["pixels"] == 0.02
+    with pytest.raises(ValueError):
+        image_difference(image, reference[:5])
+
+
+def test_list_equivalences(capsys):
+    assert main(["--list", "--equivalence"]) == 0
+    assert capsys.readouterr().out.split() == list(EQUIVALENCES)
+
+
+@pytest.mark.parametrize("name", list(EQUIVALENCES))
+def test_rendering_paths_are_equivalent(name):
+    result = run_equivalences(f"{name}", size=200, repeat=1)["results"][name]
+    assert result["passed"], result["difference"]
+    for path in ("reference", "candidate"):
+        assert result[path]["min"] > 0
+        assert result[path]["python_peak_memory"] > 0
+        assert result[path]["peak_rss"] is None or result[path]["peak_rss"] >= 0
@@ -0,0 +1,55 @@
+import numpy as np
+
+import gizeh as gz
+
+
+def test_batched_matrices():
+    np.random.seed(123)
+    angles = 2 * np.pi * np.random.rand(10)
+    xy = 100 * np.random.rand(10, 2)
+    scales = np.random.rand(10, 2)
+
+    rotations = gz.rotation_matrices(angles)
+    translations = gz.translation_matrices(xy)
+    scalings = gz.scaling_matrices(scales[:, 0], scales[:, 1])
+    assert rotations.shape == translations.shape == scalings.shape == (10, 3, 3)
+    for i in range(10):
+        assert np.allclose(rotations[i], gz.rotation_matrix(angles[i]))
+        assert np.allclose(translations[i], gz.translation_matrix(xy[i]))
+        assert np.allclose(scalings[i], gz.scaling_matrix(*scales[i]))
+
+    matrices = gz.transform_matrices(xy=xy, angle=angles, scale=scales)
+    expected = np.matmul(translations, np.matmul(rotations, scalings))
+    assert np.allclose(matrices, expected)
+
+
+def test_transform_points():
+    matrices = gz.transform_matrices(xy=[[10, 0], [0, 10]], angle=[0, np.pi / 2])
+    points = np.array([[1.0, 0], [0, 1]])
+    assert np.allclose(gz.transform_points(matrices[0], points), [[11, 0], [10, 1]])
+    assert np.allclose(gz.transform_points(matrices, points), [[11, 0], [-1, 10]])
+    assert gz.transform_points(matrices[:, None], points).shape == (2, 2, 2)
+
+
+def test_geometry_cache():
+    gz.clear_geometry_cache()
+    stars = [gz.star(5, radius=10, ratio=0.5, xy=(i, i)) for i in range(10)]
+    gz.regular_polygon(10, 6)
+    gz.ellipse(10, 20)
+    gz.ellipse(10, 20)
+
+    info = gz.geometry_cache_info()
+    assert info["star_points"]["misses"] == 1
+    assert info["star_points"]["hit_rate"] == 0.9
+    assert info["regular_polygon_points"]["size"] == 1
+    assert info["ellipse_curves"]["hits"] == 1
+
+    from gizeh.geometry import star_points
+
+    points = star_points(5, 10, 0.5)
+    assert points is star_points(5, 10, 0.5)
+    assert not points.flags.writeable
+
+    surface = gz.Surface(30, 30)
+    for s in stars:
+        s.draw(surface)
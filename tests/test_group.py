@@ -0,0 +1,126 @@
+import numpy as np
+import pytest
+
+import gizeh as gz
+
+
+def _mixed_elements():
+    gradient = gz.ColorGradient(
+        "linear", [(0, (1, 0, 0)), (1, (0, 0, 1))], xy1=(-10, 0), xy2=(10, 0)
+    )
+    return [
+        gz.square(20, xy=(20, 20), fill=(1, 0, 0), stroke_width=3, line_join="round"),
+        gz.square(20, xy=(50, 20), fill=(1, 0, 0), stroke_width=3),
+        gz.polyline([(60, 60), (80, 90), (100, 60)], stroke_width=5, line_cap="round"),
+        gz.polyline([(10, 60), (30, 90), (50, 60)], stroke_width=5),
+        gz.text("Gizeh", fontfamily="Sans", fontsize=20, xy=(60, 120)),
+        gz.circle(10, xy=(100, 20), fill=gradient, stroke_width=1),
+        gz.circle(10, xy=(130, 20), fill=gradient, stroke=(0, 1, 0)),
+        gz.circle(10, xy=(160, 20), fill=(0, 0, 1, 0.5), stroke_width=2),
+        gz.Group([gz.star(fill=(1, 1, 0), stroke_width=0.1)]).scale(15),
+    ]
+
+
+def test_group_same_as_separate_draws():
+    elements = _mixed_elements()
+    separate = gz.Surface(200, 150, bg_color=(1, 1, 1))
+    for e in elements:
+        e.rotate(0.1).draw(separate)
+    grouped = gz.Surface(200, 150, bg_color=(1, 1, 1))
+    gz.Group(elements).rotate(0.1).draw(grouped)
+    assert (separate.get_npimage() == grouped.get_npimage()).all()
+
+
+def test_sort_by_style():
+    colors = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
+    squares = [
+        gz.square(8, xy=(10 * i + 5, 10 * j + 5), fill=colors[(i + j) % 3])
+        for i in range(10)
+        for j in range(10)
+    ]
+    unsorted = gz.Surface(100, 100)
+    gz.Group(squares).draw(unsorted)
+    sorted_ = gz.Surface(100, 100)
+    gz.Group(squares, sort_by_style=True).draw(sorted_)
+    assert (unsorted.get_npimage() == sorted_.get_npimage()).all()
+
+    order = gz.gizeh._sort_by_style(squares)
+    styles = [e.draw_method.style for e in order]
+    changes = sum(a is not b for a, b in zip(styles[:-1], styles[1:]))
+    assert changes == 2
+
+
+def test_group_clip_and_culling():
+    colors = [(1, 0, 0), (0, 1, 0), (0, 0, 1)]
+    squares = [
+        gz.square(8, xy=(10 * i + 5, 10 * j + 5), fill=colors[(i + j) % 3])
+        for i in range(10)
+        for j in range(10)
+    ]
+    clip = gz.rectangle(30, 20, xy=(35, 50))  # from (20, 40) to (50, 60)
+    clipped = gz.Surface(100, 100, bg_color=(1, 1, 1))
+    with gz.profile() as profiler:
+        gz.Group([gz.Group(squares)], clip=clip).draw(clipped)
+    # Only the squares overlapping the clip were drawn.
+    assert profiler.stats["rectangle"]["calls"] == 3 * 2
+    # Culling keeps the extents of the shapes, not their paths.
+    assert all(s.draw_method._path is None for s in squares)
+    assert clip.draw_method._path is not None
+
+    full = gz.Surface(100, 100, bg_color=(1, 1, 1))
+    gz.Group(squares).draw(full)
+    expected = np.full((100, 100, 3), 255, dtype=np.uint8)
+    expected[40:60, 20:50] = full.get_npimage()[40:60, 20:50]
+    assert (clipped.get_npimage() == expected).all()
+
+    # The clip is transformed with the group.
+    circle_clip = gz.Group(squares, clip=gz.circle(10, xy=(50, 50))).translate((5, 0))
+    surface = gz.Surface(110, 100, bg_color=(1, 1, 1))
+    circle_clip.draw(surface)
+    im = surface.get_npimage()
+    assert tuple(im[53, 58]) != (255, 255, 255)
+    assert tuple(im[50, 40]) == tuple(im[35, 55]) == (255, 255, 255)
+
+    with pytest.raises(ValueError):
+        gz.Group(squares, clip=gz.Group(squares))
+
+
+def test_group_mask():
+    gradient = gz.ColorGradient(
+        "linear", [(0, (0, 0, 0, 0)), (1, (0, 0, 0, 1))], xy1=(-50, 0), xy2=(50, 0)
+    )
+    group = gz.Group(
+        [gz.square(100, xy=(50, 50), fill=(1, 0, 0))],
+        mask=gz.circle(40, xy=(50, 50), fill=gradient),
+    )
+    surface = gz.Surface(100, 100, bg_color=(1, 1, 1))
+    group.draw(surface)
+    im = surface.get_npimage().astype(int)
+    assert tuple(im[5, 5]) == (255, 255, 255)  # outside of the mask
+    assert np.abs(im[50, 50] - [255, 127, 127]).max() <= 2  # half-transparent
+    assert np.abs(im[50, 88] - [255, 30, 30]).max() <= 4  # mostly opaque
+
+
+class _PaintEverything(gz.Element):
+    """An element with its own draw method, painting its whole context."""
+
+    def draw(self, surface):
+        ctx = surface.get_new_context()
+        ctx.set_source_rgb(1, 0, 0)
+        ctx.paint()
+
+
+def test_custom_draw_elements_are_clipped_and_masked():
+    element = _PaintEverything(None)
+    window = gz.rectangle(10, 10, xy=(15, 15), fill=(0, 0, 0))
+    over = gz.square(4, xy=(4, 4), fill=(0, 0, 1))  # drawn after the element
+    for group in [
+        gz.Group([element, over], clip=window.translate((-10, -10))),
+        gz.Group([element, over], mask=window.translate((-10, -10))),
+    ]:
+        surface = gz.Surface(30, 30, bg_color=(1, 1, 1))
+        group.draw(surface)
+        im = surface.get_npimage()
+        assert tuple(im[5, 5]) == (0, 0, 255)
+        assert tuple(im[8, 8]) == (255, 0, 0)
+        assert tuple(im[20, 20]) == (255, 255, 255)  # outside of the window
@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+
+def test_import_is_lazy():
+    # cairocffi (which loads the native cairo library) and asyncio are only
+    # imported when they are needed.
+    code = (
+        "import sys, gizeh;"
+        "print('cairocffi' in sys.modules, 'asyncio' in sys.modules);"
+        "gizeh.square(10, fill=(1, 0, 0));"
+        "print('cairocffi' in sys.modules);"
+        "gizeh.AsyncRenderer;"
+        "print('asyncio' in sys.modules)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["False", "False", "False", "True"]
+
+
+def test_group_draw_on_duck_typed_surface():
+    # Drawing works on any object providing cairo contexts, even when gizeh
+    # itself hasn't used cairo yet.
+    code = (
+        "import cairocffi, gizeh\n"
+        "class Target:\n"
+        "    surface = cairocffi.ImageSurface(cairocffi.FORMAT_ARGB32, 20, 20)\n"
+        "    def get_new_context(self):\n"
+        "        return cairocffi.Context(self.surface)\n"
+        "target = Target()\n"
+        "gizeh.Group([gizeh.square(10, xy=(10, 10), fill=(1, 0, 0))]).draw(target)\n"
+        "print(bytes(target.surface.get_data())[4 * (20 * 10 + 10) + 2])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.split() == ["255"]
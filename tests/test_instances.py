@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+import gizeh as gz
+
+
+def _transforms(n=50, seed=0):
+    rng = np.random.RandomState(seed)
+    return rng.rand(n, 2) * [200, 100], 2 * np.pi * rng.rand(n), 0.5 + rng.rand(n)
+
+
+def _render(elements, bg_color=(1, 1, 1)):
+    surface = gz.Surface(200, 100, bg_color=bg_color)
+    for element in elements:
+        element.draw(surface)
+    return surface.get_npimage().astype(int)
+
+
+def _assert_close(im1, im2):
+    # Paths are copied in cairo's fixed point format: antialiased edges may
+    # differ very slightly.
+    diff = np.abs(im1 - im2)
+    assert diff.mean() < 0.1
+    assert diff.max() <= 4
+
+
+def _copies(element, xy, angle, scale):
+    return [
+        element.scale(s).rotate(a).translate(p) for p, a, s in zip(xy, angle, scale)
+    ]
+
+
+def test_instances_same_as_copies():
+    xy, angle, scale = _transforms()
+    square = gz.square(10, fill=(1, 0, 0), stroke_width=1)
+    _assert_close(
+        _render([gz.instances(square, xy=xy, angle=angle, scale=scale)]),
+        _render(_copies(square, xy, angle, scale)),
+    )
+    circle = gz.circle(5, fill=(0, 0, 1, 0.5), stroke_width=2)
+    _assert_close(
+        _render([gz.instances(circle, xy=xy, scale=scale * 5)]),
+        _render(_copies(circle, xy, np.zeros(len(xy)), scale * 5)),
+    )
+
+
+def test_instances_of_groups_and_fills():
+    xy, angle, scale = _transforms()
+    matrices = gz.transform_matrices(xy, angle, scale)
+    group = gz.Group([gz.square(10, fill=(0, 1, 0)), gz.circle(3, fill=(1, 0, 0))])
+    _assert_close(
+        _render([gz.instances(group, matrices)]),
+        _render(_copies(group, xy, angle, scale)),
+    )
+
+    colors = np.random.RandomState(1).rand(len(xy), 3)
+    square = gz.square(10, stroke_width=1)
+    expected = _render(
+        [gz.square(10, xy=p, fill=c, stroke_width=1) for p, c in zip(xy, colors)]
+    )
+    assert np.array_equal(
+        _render([gz.instances(square, xy=xy, fills=colors)]), expected
+    )
+
+    with pytest.raises(ValueError):
+        gz.instances(square, xy=xy, fills=colors[:10])
+    with pytest.raises(ValueError):
+        gz.instances(group, xy=xy, fills=colors)
@@ -39,3 +39,30 @@ def test_pdfsurface(tmpdir):
     s.finish()
 
     # Delete test PDF
+
+
+def test_pdfsurface_pages(tmpdir):
+    filepath = os.path.join(str(tmpdir), "pages.pdf")
+    with gz.PDFSurface(filepath, 200, 100, bg_color=(1, 1, 0.8)) as pdf:
+        for i in range(5):
+            gz.circle(20 + 5 * i, xy=(100, 50), fill=(1, 0, 0)).draw(pdf)
+            pdf.new_page()
+        pdf.set_size(100, 200)
+        gz.square(50, xy=(50, 100), fill=(0, 0, 1)).draw(pdf)
+
+    with open(filepath, "rb") as f:
+        assert f.read().startswith(b"%PDF")
+
+
+def test_svgsurface(tmpdir):
+    filepath = os.path.join(str(tmpdir), "star.svg")
+    with gz.SVGSurface(filepath, 200, 200, bg_color=(1, 1, 1)) as svg:
+        gz.star(radius=70, fill=(1, 0, 0), xy=(100, 100)).draw(svg)
+
+    with open(filepath) as f:
+        content = f.read()
+    assert "<svg" in content
+    assert "<path" in content
+    # An SVG file has a single page.
+    assert not isinstance(svg, gz.PDFSurface)
+    assert not hasattr(svg, "new_page")
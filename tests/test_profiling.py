@@ -0,0 +1,28 @@
+import gizeh as gz
+
+
+def test_profiler(tmpdir):
+    squares = gz.Group([gz.square(10, xy=(10 * i, 10)) for i in range(5)], name="row")
+    scene = gz.Group([squares, gz.circle(5, fill=(1, 0, 0))])
+    surface = gz.Surface(100, 100)
+
+    with gz.profile() as profiler:
+        scene.draw(surface)
+        surface.get_npimage()
+    scene.draw(surface)  # not profiled
+
+    stats = profiler.stats
+    assert stats["rectangle"]["calls"] == 5
+    assert stats["arc"]["calls"] == 1
+    assert stats["Group"]["calls"] == stats["Group[row]"]["calls"] == 1
+    # All the elements of a group are drawn on a same context, without copies
+    assert stats["Group"]["contexts"] == 1
+    assert stats["rectangle"]["contexts"] == stats["Group[row]"]["copies"] == 0
+    assert stats["(no element)"]["bytes"] == 100 * 100 * 4
+    assert stats["Group"]["time"] >= stats["Group[row]"]["time"]
+    assert "rectangle" in profiler.report()
+
+    folded = profiler.to_folded().splitlines()
+    assert any(line.startswith("Group;Group[row];rectangle ") for line in folded)
+    profiler.write_folded(str(tmpdir.join("profile.folded")))
+    assert gz.profiling.current is None
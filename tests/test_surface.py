@@ -0,0 +1,175 @@
+import numpy as np
+
+import gizeh as gz
+from gizeh.tools import premultiply_alpha, unpremultiply_alpha
+
+
+def test_preview():
+    surface = gz.Surface(200, 100, bg_color=(1, 1, 1))
+    circle = gz.circle(30, xy=(100, 50), fill=(1, 0, 0), stroke_width=4)
+
+    preview = surface.preview(circle, scale=0.5)
+    im = preview.get_npimage()
+    assert im.shape == (50, 100, 3)
+    assert tuple(im[25, 50]) == (255, 0, 0)
+    assert tuple(im[2, 2]) == (255, 255, 255)
+
+    # Same scene as a full-resolution render averaged over 2x2 blocks.
+    full = surface.preview(circle, scale=1).get_npimage().astype(float)
+    downscaled = full.reshape(50, 2, 100, 2, 3).mean(axis=(1, 3))
+    assert np.abs(downscaled - im).mean() < 2
+
+
+def test_scaled_surface_y_origin_bottom(tmpdir):
+    surface = gz.Surface(40, 20, bg_color=(1, 1, 1), scale=2)
+    gz.rectangle(40, 10, xy=(20, 5), fill=(0, 0, 1)).draw(surface)
+    im = surface.get_npimage(y_origin="bottom")
+    assert im.shape == (40, 80, 3)
+    assert tuple(im[-1, 0]) == (0, 0, 255)
+    surface.write_to_png(str(tmpdir.join("flipped.png")), y_origin="bottom")
+
+
+def test_recording_surface(tmpdir):
+    scene = gz.Group(
+        [
+            gz.star(radius=70, ratio=0.4, fill=(1, 0, 0), stroke_width=2),
+            gz.circle(20, fill=(0, 0, 1, 0.5)),
+        ]
+    ).translate([100, 100])
+    recording = gz.RecordingSurface(200, 200, bg_color=(1, 1, 1))
+    scene.draw(recording)
+
+    direct = gz.Surface(200, 200, bg_color=(1, 1, 1))
+    scene.draw(direct)
+    replayed = recording.replay(gz.Surface(200, 200))
+    diff = direct.get_npimage().astype(int) - replayed.get_npimage()
+    assert np.abs(diff).mean() < 1
+
+    thumbnail = recording.replay(gz.Surface(200, 200, scale=0.25))
+    assert thumbnail.get_npimage().shape == (50, 50, 3)
+    flip = gz.translation_matrix([0, 200]).dot(gz.scaling_matrix(1, -1))
+    flipped = recording.replay(gz.Surface(200, 200), matrix=flip)
+    diff = flipped.get_npimage().astype(int) - replayed.get_npimage()[::-1]
+    assert np.abs(diff).mean() < 1
+
+    with gz.PDFSurface(str(tmpdir.join("replay.pdf")), 200, 200) as pdf:
+        recording.replay(pdf)
+
+    unbounded = gz.RecordingSurface()
+    scene.draw(unbounded)
+    x, y, w, h = unbounded.ink_extents()
+    assert 40 <= x <= 45 and 168 <= x + w <= 174
+
+
+def test_shared_styles_and_slots():
+    circles = [gz.circle(5, xy=(i, i), fill=(1, 0, 0)) for i in range(10)]
+    circles.append(gz.circle(5, fill=np.array([1.0, 0, 0])))
+    styles = {id(c.draw_method.style) for c in circles}
+    assert len(styles) == 1
+    assert not hasattr(circles[0], "__dict__")
+    assert circles[-1].matrix is gz.Element(None).matrix
+
+
+def test_alpha_conversions():
+    rng = np.random.RandomState(0)
+    image = rng.randint(0, 256, size=(50, 60, 4)).astype(np.uint8)
+    alpha = image[:, :, 3:] / 255.0
+
+    premultiplied = premultiply_alpha(image)
+    expected = np.round(image[:, :, :3] * alpha)
+    assert np.array_equal(premultiplied[:, :, :3], expected)
+    assert np.array_equal(premultiplied[:, :, 3], image[:, :, 3])
+
+    straight = unpremultiply_alpha(premultiplied)
+    opaque_enough = image[:, :, 3] >= 128
+    diff = straight[opaque_enough].astype(int) - image[opaque_enough]
+    assert np.abs(diff).max() <= 1
+
+    # in-place
+    assert unpremultiply_alpha(premultiplied, out=premultiplied) is premultiplied
+    assert np.array_equal(premultiplied, straight)
+
+
+def test_transparent_npimage_has_straight_alpha():
+    surface = gz.Surface(20, 20)
+    gz.square(10, xy=(10, 10), fill=(1, 0.5, 0, 0.5)).draw(surface)
+    r, g, b, a = surface.get_npimage(transparent=True)[10, 10]
+    assert (r, b) == (255, 0)
+    assert abs(int(g) - 128) <= 1
+    assert abs(int(a) - 128) <= 1
+    # without transparency, the pixel is blended over black
+    blended = surface.get_npimage()[10, 10].astype(int)
+    assert np.abs(blended - [128, 64, 0]).max() <= 1
+
+    image = surface.get_npimage(transparent=True)
+    flipped = surface.get_npimage(transparent=True, y_origin="bottom")
+    assert np.array_equal(flipped, image[::-1])
+    roundtrip = gz.Surface.from_image(image).get_npimage(transparent=True)
+    assert np.abs(roundtrip.astype(int) - image).max() <= 1
+
+
+def test_from_image_channels():
+    gray = np.arange(12, dtype=np.uint8).reshape(3, 4)
+    rgb = np.dstack(3 * [gray])
+    for image in (gray, gray[:, :, None], rgb):
+        surface = gz.Surface.from_image(image)
+        assert np.array_equal(surface.get_npimage(), rgb)
+
+
+def test_numpy_image_fill():
+    from gizeh.gizeh import _image_source
+
+    image = np.zeros((20, 20, 3), dtype=np.uint8)
+    image[:, :10] = (255, 0, 0)
+    image[:, 10:] = (0, 0, 255)
+    squares = [gz.square(10, xy=(5 + 10 * i, 5), fill=image) for i in range(4)]
+    surface = gz.Surface(40, 10)
+    gz.Group(squares).draw(surface)
+    im = surface.get_npimage()
+    # The image's top-left corner is at the center of each square.
+    assert tuple(im[7, 7]) == (255, 0, 0)
+    assert tuple(im[2, 2]) == (0, 0, 0)
+
+    # The image is converted once, and again when modified.
+    source = _image_source(image)
+    assert _image_source(image) is source
+    image[:] = 255
+    assert _image_source(image) is not source
+    surface = gz.Surface(10, 10)
+    gz.square(10, xy=(5, 5), fill=image).draw(surface)
+    assert tuple(surface.get_npimage()[7, 7]) == (255, 255, 255)
+
+
+def test_numpy_image_checked_once_per_pass(monkeypatch):
+    from gizeh import gizeh as gizeh_module
+
+    checks = []
+    image_version = gizeh_module._image_version
+    monkeypatch.setattr(
+        gizeh_module,
+        "_image_version",
+        lambda image: checks.append(1) or image_version(image),
+    )
+    image = np.zeros((10, 10, 3), dtype=np.uint8)
+    squares = [gz.square(10, xy=(5 + 10 * i, 5), fill=image) for i in range(4)]
+    gz.Group(squares).draw(gz.Surface(40, 10))
+    assert len(checks) == 1
+
+
+def test_numpy_image_cache_finalizers_are_bounded():
+    import weakref
+
+    from gizeh import gizeh as gizeh_module
+
+    n_finalizers = len(weakref.finalize._registry)
+    images = [
+        np.full((4, 4, 3), i, dtype=np.uint8)
+        for i in range(gizeh_module.IMAGE_CACHE_SIZE + 8)
+    ]
+    for _ in range(5):  # the images are evicted and come back
+        for image in images:
+            gizeh_module._image_source(image)
+    assert len(weakref.finalize._registry) - n_finalizers == len(images)
+    del images, image
+    assert len(weakref.finalize._registry) == n_finalizers
+    assert not gizeh_module._image_sources
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import gizeh as gz
+
+
+def test_timeline():
+    calls = {"title": 0, "ball": 0}
+
+    def make_title(t):
+        calls["title"] += 1
+        return gz.rectangle(20 + 20 * (t >= 1), 10, xy=(50, 10), fill=(0, 0, 1))
+
+    def make_ball(t):
+        calls["ball"] += 1
+        return gz.circle(10, xy=(10 + 50 * t, 50), fill=(1, 0, 0, 0.5))
+
+    background = gz.square(60, xy=(50, 50), fill=(0, 1, 0))
+    timeline = gz.Timeline(
+        [
+            gz.Layer(background),
+            gz.Layer(make_title, "piecewise", breakpoints=[1]),
+            gz.Layer(make_ball),
+        ],
+        width=100,
+        height=100,
+        bg_color=(1, 1, 1),
+    )
+    times = np.linspace(0, 1.5, 7)
+    frames = [timeline.make_frame(t) for t in times]
+    assert calls == {"title": 2, "ball": 7}
+
+    for t, frame in zip(times, frames):
+        direct = gz.Surface(100, 100, bg_color=(1, 1, 1))
+        timeline.element_at(t).draw(direct)
+        diff = direct.get_npimage().astype(int) - frame
+        assert np.abs(diff).max() <= 1
+
+
+def test_layer_errors():
+    with pytest.raises(ValueError):
+        gz.Layer(lambda t: gz.circle(1), "sometimes")
+    with pytest.raises(ValueError):
+        gz.Layer(lambda t: gz.circle(1), "piecewise")
+    with pytest.raises(ValueError):
+        gz.Layer(lambda t: gz.circle(1), "continuous", breakpoints=[1])
+
+
+def test_layer_timing_inference():
+    assert gz.Layer(gz.circle(1)).timing == "static"
+    assert gz.Layer(lambda t: gz.circle(t)).timing == "continuous"
+    layer = gz.Layer(lambda t: gz.circle(1 + int(t)), breakpoints=[1])
+    assert layer.timing == "piecewise"
+    assert layer.key_at(0.5) != layer.key_at(1.5)
+    layer = gz.Layer(lambda t: gz.circle(1 + int(t)), key=int)
+    assert (layer.timing, layer.key_at(2.5)) == ("piecewise", 2)
+
+
+def test_layer_element_lists():
+    layer = gz.Layer(lambda t: [gz.circle(t), gz.square(t)], "continuous")
+    element = layer.element_at(2)
+    assert isinstance(element, gz.Group)
+    assert len(element.elements) == 2
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+import gizeh as gz
+
+
+def test_htmlcolor_to_rgb():
+    assert gz.htmlcolor_to_rgb("#ff8000") == [1.0, 128 / 255, 0.0]
+    with pytest.raises(ValueError):
+        gz.htmlcolor_to_rgb("ff8000")
+
+
+def test_parse_color():
+    orange = (1.0, 128 / 255, 0.0)
+    for string in ["#ff8000", "#FF8000", " rgb(255, 128, 0) ", "rgb(100%, 50.2%, 0%)"]:
+        assert np.allclose(gz.parse_color(string), orange, atol=1e-3)
+    assert gz.parse_color("#f80") == (1.0, 136 / 255, 0.0)
+    assert gz.parse_color("#ff800080") == (1.0, 128 / 255, 0.0, 128 / 255)
+    assert gz.parse_color("rgba(255, 0, 0, 0.5)") == (1.0, 0.0, 0.0, 0.5)
+    assert gz.parse_color("Navy") == (0.0, 0.0, 128 / 255)
+    for string in ["#ff800", "#ff80zz", "rgb(1, 2)", "hsl(0, 0%, 0%)", "reddish"]:
+        with pytest.raises(ValueError):
+            gz.parse_color(string)
+
+
+def test_parse_colors():
+    colors = gz.parse_colors(["red", "#00ff00", "red", "blue"])
+    assert colors.shape == (4, 3)
+    assert np.array_equal(colors, [[1, 0, 0], [0, 1, 0], [1, 0, 0], [0, 0, 1]])
+    colors = gz.parse_colors(np.array([["red", "transparent"]]))
+    assert np.array_equal(colors, [[[1, 0, 0, 1], [0, 0, 0, 0]]])
+    assert gz.parse_colors([]).shape == (0, 3)
+
+
+def test_color_strings_as_sources():
+    square = gz.square(10, fill="#ff0000", stroke="rgba(0, 0, 255, 0.5)")
+    assert square.draw_method.style.fill == (1.0, 0.0, 0.0)
+    assert square.draw_method.style.stroke == (0.0, 0.0, 1.0, 0.5)
+    # shapes with the same colors, given in different ways, share a style
+    assert gz.square(5, fill=(1, 0, 0), stroke=(0, 0, 1, 0.5)).draw_method.style is (
+        square.draw_method.style
+    )
+    markers = gz.instances(square, xy=np.zeros((3, 2)), fills=["red", "lime", "red"])
+    assert markers.fills == [(1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (1.0, 0.0, 0.0)]